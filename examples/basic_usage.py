@@ -15,6 +15,18 @@ from safety import check_command_safety
 from utils import print_command_preview, execute_command
 from config import load_config
 
+# Example prompts to try
+EXAMPLE_PROMPTS = [
+    "list all Python files in the current directory",
+    "show disk usage in human-readable format",
+    "find the 5 largest files in /tmp",
+    "count lines of code in all Python files recursively"
+]
+
+# Menu choice -> prompt; None means "enter your own"
+_CHOICES = {str(i): prompt for i, prompt in enumerate(EXAMPLE_PROMPTS, 1)}
+_CHOICES["0"] = None
+
 def run_example():
     """Run a basic example of Smart-Shell."""
     print("Smart-Shell Basic Example")
@@ -27,30 +39,22 @@ def run_example():
         print("Run: python main.py --setup")
         return
     
-    # Example prompts to try
-    example_prompts = [
-        "list all Python files in the current directory",
-        "show disk usage in human-readable format",
-        "find the 5 largest files in /tmp",
-        "count lines of code in all Python files recursively"
-    ]
-    
     # Let user choose a prompt or enter their own
     print("\nChoose an example prompt or enter your own:")
-    for i, prompt in enumerate(example_prompts, 1):
+    for i, prompt in enumerate(EXAMPLE_PROMPTS, 1):
         print(f"{i}. {prompt}")
     print("0. Enter your own prompt")
     
-    choice = input("\nYour choice (0-4): ")
+    choice = input(f"\nYour choice (0-{len(EXAMPLE_PROMPTS)}): ").strip()
     
-    if choice == "0":
-        prompt = input("Enter your prompt: ")
-    elif choice in ["1", "2", "3", "4"]:
-        prompt = example_prompts[int(choice) - 1]
-    else:
+    if choice not in _CHOICES:
         print("Invalid choice.")
         return
     
+    prompt = _CHOICES[choice]
+    if prompt is None:
+        prompt = input("Enter your prompt: ")
+    
     print(f"\nPrompt: {prompt}")
     print("Generating command...")
     
@@ -5,7 +5,22 @@ Smart-Shell - An intelligent terminal assistant that converts natural language i
 __version__ = "1.0.0"
 __author__ = "Lusan Sapkota"
 
-# Make key modules available at package level
-from .main import main
-from .setup_logic import setup_config
-from .config import load_config, save_config
+# Key functions available at package level. They are imported on first
+# access (PEP 562) so that importing one submodule doesn't pull in the CLI,
+# rich and the Gemini client. `smart_shell.main` is the CLI submodule; its
+# entry point is `smart_shell.main:main`.
+_LAZY_ATTRS = {
+    "setup_config": ".setup_logic",
+    "load_config": ".config",
+    "save_config": ".config",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(_LAZY_ATTRS[name], __name__), name)
+    globals()[name] = value
+    return value
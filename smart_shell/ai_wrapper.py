@@ -3,18 +3,254 @@ AI Wrapper Module - Provides a unified interface for AI model interactions.
 """
 
 import os
+import re
 import sys
 import time
+import random
+import threading
+import socket
+import hashlib
 import requests
+from collections import OrderedDict
+from functools import lru_cache
+from types import SimpleNamespace
 from rich.console import Console
 from typing import Optional
 
+from . import jsonlib
+
 console = Console()
 
 # Maximum number of retries for API calls
 MAX_RETRIES = 3
-# Delay between retries (in seconds)
-RETRY_DELAY = 2
+# Base delays (in seconds) for exponential backoff between retries: short for
+# network blips, longer for rate limits, never more than MAX_RETRY_DELAY
+RETRY_DELAY = 0.25
+RATE_LIMIT_RETRY_DELAY = 2
+MAX_RETRY_DELAY = 30
+# Seconds a successful connectivity check (or API call) is trusted for
+NET_CHECK_TTL = 30
+# Host the Gemini API is served from; resolving it is the connectivity check
+API_HOST = "generativelanguage.googleapis.com"
+# Models reported when the API does not return any
+DEFAULT_MODELS = ("gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-pro")
+# Model used when the requested one can't be accessed
+FALLBACK_MODEL = DEFAULT_MODELS[0]
+# On-disk copy of the model list; it changes rarely, so it is reused for a day
+MODELS_CACHE_FILE = os.path.expanduser("~/.cache/smart-shell/models.json")
+MODELS_CACHE_TTL = 24 * 60 * 60
+
+# Error message classifiers, matched against the lowercased message. The
+# lookaheads require both words anywhere in the message, in either order.
+_RATE_LIMIT_RE = re.compile(r"quota|rate limit|exceeded")
+_NETWORK_RE = re.compile(r"network|connection|timeout")
+_INVALID_KEY_RE = re.compile(r"^(?=.*invalid)(?=.*key)|api.?key not valid", re.DOTALL)
+_BLOCKED_RE = re.compile(r"blocked|^(?=.*content)(?=.*policy)", re.DOTALL)
+_TOO_LONG_RE = re.compile(r"too long|^(?=.*token)(?=.*limit)", re.DOTALL)
+
+# google-genai clients keyed by API key, created once per process and shared
+# by every GeminiWrapper using that key
+_clients = {}
+
+# Recent response texts keyed by a hash of the full request, so repeating the
+# same request (e.g. explaining the same command) skips the API call
+RESPONSE_CACHE_SIZE = 256
+# Seconds a cached response stays valid
+RESPONSE_CACHE_TTL = 3600
+_response_cache = OrderedDict()
+
+# Requests currently being sent, keyed like the response cache. A thread that
+# finds its request here waits for the first one instead of sending it again.
+_inflight = {}
+_inflight_lock = threading.Lock()
+
+# System prompt used to explain shell commands
+EXPLAIN_SYSTEM_PROMPT = """
+        You are a helpful shell command explainer. Given a shell command, explain what it does in simple terms.
+        Keep your explanation concise but thorough, focusing on potential risks or side effects.
+        Format your response as plain text with no markdown or special formatting.
+        """
+# Sampling for explanations: greedy decoding, since there is one right answer
+# and it needs no creativity. The token limit stays at the default because
+# Gemini 2.5 "thinking" tokens count towards it.
+EXPLAIN_PARAMS = {"temperature": 0.0, "top_p": 1.0, "top_k": 1}
+
+# Gemini API keys are "AIza" followed by 35 URL-safe base64 characters
+_KEY_RE = re.compile(r"^AIza[0-9A-Za-z\-_]{35}$")
+
+# Recent validate_api_key results, keyed by a hash of the key: (time, is_valid, message)
+VALIDATION_TTL = 300
+_validated = {}
+
+# GeminiWrapper instances keyed by a short hash of the API key, so the wrapper
+# built for the first prompt is reused by every later one
+_wrappers = {}
+
+@lru_cache(maxsize=None)
+def _get_genai():
+    """Import google.genai and the google.api_core exceptions on first use and keep them for the process."""
+    from google import genai
+    from google.api_core import exceptions
+    return genai, exceptions
+
+@lru_cache(maxsize=None)
+def _get_types():
+    """Import google.genai.types on first use and keep it for the process."""
+    from google.genai import types
+    return types
+
+@lru_cache(maxsize=32)
+def _make_config(system_prompt, temperature, top_p, top_k, max_output_tokens):
+    """
+    Build a GenerateContentConfig, reusing it for identical settings.
+    
+    System prompts are constants or rendered once per session, so in
+    practice a session only ever builds a couple of configs. The returned
+    object is shared and must not be modified.
+    """
+    return _get_types().GenerateContentConfig(
+        system_instruction=system_prompt,
+        temperature=temperature,
+        top_p=top_p,
+        top_k=top_k,
+        max_output_tokens=max_output_tokens,
+    )
+
+@lru_cache(maxsize=None)
+def _http2_available():
+    """Check whether httpx can negotiate HTTP/2 (needs the optional h2 package)."""
+    import importlib.util
+    return importlib.util.find_spec("h2") is not None
+
+def _get_client(genai, api_key):
+    """
+    Return the shared google-genai client for an API key, creating it on first use.
+    
+    The client owns a keep-alive HTTP connection pool, so sharing it means
+    only the first request of the process pays for the TCP/TLS handshake.
+    
+    Args:
+        genai: The imported google.genai module
+        api_key (str): API key for Gemini
+        
+    Returns:
+        genai.Client: The client for this key
+    """
+    client = _clients.get(api_key)
+    if client is None:
+        kwargs = {}
+        if _http2_available():
+            # Multiplex requests over one connection where the server allows it
+            kwargs["http_options"] = _get_types().HttpOptions(client_args={"http2": True})
+        client = _clients[api_key] = genai.Client(api_key=api_key, **kwargs)
+    return client
+
+def _backoff_delay(retries, base=RETRY_DELAY, error=None):
+    """
+    Compute how long to wait before a retry.
+    
+    Uses exponential backoff with jitter, so clients that failed together
+    don't retry in lockstep. A Retry-After value carried by the error wins.
+    
+    Args:
+        retries (int): Number of retries already made
+        base (float): Delay before the first retry, in seconds
+        error (Exception, optional): The error being retried
+        
+    Returns:
+        float: Seconds to sleep
+    """
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        try:
+            return min(MAX_RETRY_DELAY, float(retry_after))
+        except (TypeError, ValueError):
+            pass
+    return min(MAX_RETRY_DELAY, base * (2 ** retries) * random.uniform(0.5, 1.5))
+
+def _is_invalid_key_error(error):
+    """
+    Tell whether an API error means the key was rejected.
+    
+    google-genai raises its own ClientError (not the google.api_core
+    exceptions), e.g. "400 INVALID_ARGUMENT ... API key not valid", so the
+    HTTP code and the message are checked rather than the exception type.
+    
+    Args:
+        error (Exception): The error raised by the API call
+        
+    Returns:
+        bool: True for authentication failures
+    """
+    return getattr(error, "code", None) in (401, 403) or _INVALID_KEY_RE.search(str(error).lower()) is not None
+
+def _models_cache_key(api_key):
+    """Hash an API key for the model list cache, so the key itself is not written to disk."""
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+
+def _load_cached_models(api_key):
+    """Return the model list cached on disk for this API key, or None if it is missing, stale or another key's."""
+    try:
+        if time.time() - os.stat(MODELS_CACHE_FILE).st_mtime >= MODELS_CACHE_TTL:
+            return None
+        with open(MODELS_CACHE_FILE, "rb") as f:
+            cached = jsonlib.loads(f.read())
+    except (OSError, jsonlib.JSONDecodeError):
+        return None
+    # Files written before the key was recorded are plain lists and never match
+    if not isinstance(cached, dict) or cached.get("key") != _models_cache_key(api_key):
+        return None
+    models = cached.get("models")
+    if isinstance(models, list) and models and all(isinstance(name, str) for name in models):
+        return models
+    return None
+
+def _save_cached_models(api_key, models):
+    """Write the model list for an API key to the disk cache, ignoring I/O errors."""
+    try:
+        os.makedirs(os.path.dirname(MODELS_CACHE_FILE), exist_ok=True)
+        with open(MODELS_CACHE_FILE, "wb") as f:
+            f.write(jsonlib.dumps_bytes({"key": _models_cache_key(api_key), "models": list(models)}))
+    except OSError:
+        pass
+
+def _response_cache_key(model, prompts, params):
+    """Hash a request (model, both prompts and sampling parameters) into a cache key."""
+    return hashlib.sha1(repr((model, prompts[0], prompts[1], sorted(params.items()))).encode("utf-8")).hexdigest()
+
+def _get_cached_response(key):
+    """Return the cached response text for a key, or None if missing or expired."""
+    cached = _response_cache.get(key)
+    if cached is None:
+        return None
+    stored_at, text = cached
+    if time.monotonic() - stored_at >= RESPONSE_CACHE_TTL:
+        _response_cache.pop(key, None)
+        return None
+    _response_cache.move_to_end(key)
+    return text
+
+def _store_response(key, response):
+    """Cache the text of a response, evicting the least recently used entry if full."""
+    if getattr(response, "text", None):
+        _response_cache[key] = (time.monotonic(), response.text)
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+def looks_like_api_key(api_key):
+    """
+    Check a key against the usual Gemini format ("AIza" + 35 URL-safe characters).
+    
+    A mismatch only warrants a warning: proxy, enterprise or future keys may
+    look different, so validate_api_key asks the API either way.
+    
+    Args:
+        api_key (str): The API key to check.
+        
+    Returns:
+        bool: True if the key has the usual format.
+    """
+    return bool(api_key) and _KEY_RE.match(api_key) is not None
 
 def validate_api_key(api_key):
     """
@@ -29,11 +265,29 @@ def validate_api_key(api_key):
     if not api_key or len(api_key) < 10:
         return False, "API key is too short or empty."
 
+    key_hash = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    cached = _validated.get(key_hash)
+    if cached and time.monotonic() - cached[0] < VALIDATION_TTL:
+        return cached[1], cached[2]
+
+    result = _validate_api_key(api_key)
+    # Network and unexpected errors say nothing about the key, so retry those next time
+    if result[0] or result[1].startswith("Invalid API key"):
+        _validated[key_hash] = (time.monotonic(),) + result
+    return result
+
+def _recently_validated(api_key):
+    """Return True if validate_api_key accepted this key within VALIDATION_TTL."""
+    cached = _validated.get(hashlib.sha256(api_key.encode("utf-8")).hexdigest())
+    return bool(cached and cached[1] and time.monotonic() - cached[0] < VALIDATION_TTL)
+
+def _validate_api_key(api_key):
+    """Make the models.list() call behind validate_api_key."""
     try:
-        from google import genai
-        from google.api_core import exceptions as google_exceptions
+        genai, google_exceptions = _get_genai()
 
-        client = genai.Client(api_key=api_key)
+        # Shared with the wrapper created after setup, so its connection is reused
+        client = _get_client(genai, api_key)
         
         # This is a lightweight call to check if the key is valid
         models = client.models.list()
@@ -51,6 +305,8 @@ def validate_api_key(api_key):
     except requests.exceptions.ConnectionError:
         return False, "No internet connection. Please check your network."
     except Exception as e:
+        if _is_invalid_key_error(e):
+            return False, f"Invalid API key: {str(e)}"
         return False, f"An unexpected error occurred during validation: {str(e)}"
 
 def get_wrapper(api_key):
@@ -63,8 +319,13 @@ def get_wrapper(api_key):
     Returns:
         object: AI wrapper instance
     """
+    key_hash = hashlib.blake2b(api_key.encode("utf-8"), digest_size=8).hexdigest() if api_key else None
+    wrapper = _wrappers.get(key_hash) if key_hash else None
+    if wrapper is not None:
+        return wrapper
+    
     try:
-        return GeminiWrapper(api_key)
+        wrapper = GeminiWrapper(api_key)
     except ImportError as e:
         console.print(f"[red]Error: {str(e)}[/red]")
         console.print("[yellow]Please install the required dependencies:[/yellow]")
@@ -73,6 +334,10 @@ def get_wrapper(api_key):
     except Exception as e:
         console.print(f"[red]Error initializing AI wrapper: {str(e)}[/red]")
         sys.exit(1)
+    
+    if key_hash:
+        _wrappers[key_hash] = wrapper
+    return wrapper
 
 class GeminiWrapper:
     """Wrapper for Google's Gemini API."""
@@ -84,6 +349,10 @@ class GeminiWrapper:
         Args:
             api_key (str): API key for Gemini
         """
+        self.api_key = api_key
+        # Monotonic time of the last successful connectivity check or API call
+        self._last_net_check_ok_at = 0.0
+        
         try:
             # Import the google-genai library
             try:
@@ -99,93 +368,99 @@ class GeminiWrapper:
                     from google import genai
                     self.genai = genai
                 
-                # Initialize the client with the API key
-                self.client = genai.Client(api_key=api_key)
+                # Reuse the client for this API key if one was already created
+                self.client = _get_client(genai, api_key)
                 
             except ImportError:
                 raise ImportError("Could not import google-genai. Please install it manually with: pip install google-genai")
             except Exception as install_error:
                 raise Exception(f"Failed to install dependency: {str(install_error)}")
             
-            # Test API key validity and internet connection
-            try:
-                # First check internet connectivity
-                self._check_internet_connection()
-                
-                # Then check API key validity by listing models
-                models = self.client.models.list()
-                if not models:
-                    raise Exception("No models available - API key may be invalid")
-            except requests.exceptions.ConnectionError:
-                raise Exception("No internet connection. Please check your network and try again.")
-            except requests.exceptions.Timeout:
-                raise Exception("Connection timed out. Please check your network and try again.")
-            except Exception as api_e:
-                error_msg = str(api_e).lower()
-                if "invalid api key" in error_msg or "unauthorized" in error_msg or "forbidden" in error_msg:
-                    raise Exception("Invalid API key")
-                elif "quota" in error_msg or "limit" in error_msg:
-                    raise Exception("API quota exceeded")
-                else:
-                    raise Exception(f"API connection error: {str(api_e)}")
-            
+            # The key is not checked here: listing models would add a full
+            # round trip to every start. An invalid key is reported by the
+            # first request instead (and validate_api_key covers setup).
         except Exception as e:
             raise Exception(f"Failed to initialize Gemini API: {str(e)}")
     
+    def warm_up(self):
+        """
+        Open the client's pooled HTTPS connection so the first real call skips the handshake.
+        
+        Sends a HEAD request to the API host on the client's own HTTP pool,
+        which calls no API method and uses no quota. Skipped if
+        validate_api_key has just made a request on this client.
+        """
+        if self.api_key and _recently_validated(self.api_key):
+            return
+        # google-genai does not expose its HTTP client, so look it up defensively
+        api_client = getattr(self.client, "_api_client", None)
+        http_client = getattr(api_client, "_httpx_client", None)
+        if http_client is None:
+            return
+        base_url = getattr(getattr(api_client, "_http_options", None), "base_url", None) or f"https://{API_HOST}/"
+        try:
+            http_client.head(base_url, timeout=5)
+        except Exception:
+            pass
+    
+    def _connection_error_message(self, message):
+        """
+        Pick the message for a request that failed with a network error.
+        
+        Probes connectivity (ignoring any remembered success) to tell a
+        missing connection apart from a problem reaching the API itself.
+        
+        Args:
+            message (str): Message to use if the connection looks fine
+            
+        Returns:
+            str: The error message to raise
+        """
+        self._last_net_check_ok_at = 0.0
+        try:
+            self._check_internet_connection()
+        except Exception:
+            return "No internet connection. Please check your network and try again."
+        return message
+    
     def _check_internet_connection(self):
         """
         Check if there is an active internet connection.
         
+        A success is remembered for NET_CHECK_TTL seconds, as is any
+        successful API call, so back-to-back requests don't re-probe.
+        
         Raises:
             Exception: If no internet connection is available
         """
+        if time.monotonic() - self._last_net_check_ok_at < NET_CHECK_TTL:
+            return
+        
         try:
-            # Try to connect to Google's DNS server
-            requests.get("https://8.8.8.8", timeout=3)
-        except (requests.ConnectionError, requests.Timeout):
+            # Resolve the API host: a single DNS lookup, no TCP or TLS
+            # handshake, and it checks the host we are actually going to call
+            socket.getaddrinfo(API_HOST, 443, type=socket.SOCK_STREAM)
+        except OSError:
             raise Exception("No internet connection detected")
+        self._last_net_check_ok_at = time.monotonic()
     
-    def get_model(self, model_name="gemini-2.5-pro"):
+    def get_model(self, model_name=FALLBACK_MODEL):
         """
         Get a Gemini model.
         
+        Connectivity is not checked here; network and model errors are
+        reported by the first request that uses the model.
+        
         Args:
             model_name (str, optional): Name of the model to use. Defaults to "gemini-2.5-pro".
             
         Returns:
             str: Gemini model name to use for generation
         """
-        try:
-            # First check internet connectivity
-            self._check_internet_connection()
-            
-            # With the new API, we just return the model name as a reference
-            return model_name
-            
-        except requests.exceptions.ConnectionError:
-            raise Exception("No internet connection. Please check your network and try again.")
-        except requests.exceptions.Timeout:
-            raise Exception("Connection timed out. Please check your network and try again.")
-        except Exception as e:
-            error_msg = str(e).lower()
-            
-            # Handle specific error cases
-            if "not found" in error_msg or "does not exist" in error_msg:
-                console.print(f"[red]Error: Model '{model_name}' not found or no longer available.[/red]")
-                console.print("[yellow]The API or model version may be outdated.[/yellow]")
-                console.print("[yellow]Falling back to default model gemini-2.5-pro...[/yellow]")
-                return "gemini-2.5-pro"
-            elif "unauthorized" in error_msg or "permission" in error_msg:
-                console.print(f"[red]Error: No permission to access model '{model_name}'.[/red]")
-                console.print("[yellow]Your API key may not have access to this model.[/yellow]")
-                console.print("[yellow]Falling back to default model gemini-2.5-pro...[/yellow]")
-                return "gemini-2.5-pro"
-            else:
-                console.print(f"[red]Error getting model {model_name}: {str(e)}[/red]")
-                console.print("[yellow]Falling back to default model gemini-2.5-pro...[/yellow]")
-                return "gemini-2.5-pro"
+        # With the new API, we just return the model name as a reference
+        return model_name or FALLBACK_MODEL
     
-    def generate_content(self, model, prompts, retry=True, **kwargs):
+    def generate_content(self, model, prompts, retry=True, cache=True, **kwargs):
         """
         Generate content using the specified model.
         
@@ -193,11 +468,46 @@ class GeminiWrapper:
             model (str): Gemini model name
             prompts (list): List of prompts (system prompt and user prompt)
             retry (bool): Whether to retry on failure
+            cache (bool): Whether to use the response cache; if False, the
+                request is always sent and its response is not stored
             **kwargs: Additional arguments for the model
             
         Returns:
-            object: Generated content
+            object: Generated content; repeated requests are served from the
+            response cache as an object with only a `text` attribute
         """
+        if not cache:
+            return self._generate_content(model, prompts, None, retry, **kwargs)
+        
+        cache_key = _response_cache_key(model, prompts, kwargs)
+        cached = _get_cached_response(cache_key)
+        if cached is not None:
+            return SimpleNamespace(text=cached)
+        
+        with _inflight_lock:
+            event = _inflight.get(cache_key)
+            owner = event is None
+            if owner:
+                event = _inflight[cache_key] = threading.Event()
+        
+        if not owner:
+            # An identical request is already in flight; use its result
+            event.wait()
+            cached = _get_cached_response(cache_key)
+            if cached is not None:
+                return SimpleNamespace(text=cached)
+            # It failed, so make the request ourselves
+            return self._generate_content(model, prompts, cache_key, retry, **kwargs)
+        
+        try:
+            return self._generate_content(model, prompts, cache_key, retry, **kwargs)
+        finally:
+            with _inflight_lock:
+                del _inflight[cache_key]
+            event.set()
+    
+    def _generate_content(self, model, prompts, cache_key, retry, **kwargs):
+        """Send a generation request, retrying temporary failures, and cache the result unless `cache_key` is None."""
         # Extract system prompt and user prompt
         system_prompt = prompts[0]
         user_prompt = prompts[1]
@@ -205,63 +515,56 @@ class GeminiWrapper:
         retries = 0
         while retries <= MAX_RETRIES:
             try:
-                # Check internet connection before making the API call
-                self._check_internet_connection()
-                
                 # Generate content using the google-genai API
-                from google.genai import types
-                
                 response = self.client.models.generate_content(
                     model=model,
                     contents=user_prompt,
-                    config=types.GenerateContentConfig(
-                        system_instruction=system_prompt,
-                        temperature=kwargs.get("temperature", 0.2),
-                        top_p=kwargs.get("top_p", 0.8),
-                        top_k=kwargs.get("top_k", 40),
-                        max_output_tokens=kwargs.get("max_output_tokens", 200),
-                    )
+                    config=self._generation_config(system_prompt, **kwargs)
                 )
                 
+                self._last_net_check_ok_at = time.monotonic()
+                if cache_key is not None:
+                    _store_response(cache_key, response)
+                
                 return response
                     
             except requests.exceptions.ConnectionError:
                 if not retry or retries >= MAX_RETRIES:
-                    raise Exception("No internet connection. Please check your network and try again.")
+                    raise Exception(self._connection_error_message("Could not connect to the Gemini API. Please try again later."))
                 console.print(f"[yellow]Network connection error. Retrying ({retries+1}/{MAX_RETRIES})...[/yellow]")
-                time.sleep(RETRY_DELAY)
+                time.sleep(_backoff_delay(retries))
                 retries += 1
                 
             except requests.exceptions.Timeout:
                 if not retry or retries >= MAX_RETRIES:
                     raise Exception("Connection timed out. Please check your network and try again.")
                 console.print(f"[yellow]Connection timed out. Retrying ({retries+1}/{MAX_RETRIES})...[/yellow]")
-                time.sleep(RETRY_DELAY)
+                time.sleep(_backoff_delay(retries))
                 retries += 1
                 
             except Exception as e:
                 error_msg = str(e).lower()
                 
                 # For some errors, we can retry
-                if ("quota" in error_msg or "rate limit" in error_msg or "exceeded" in error_msg or 
-                    "network" in error_msg or "connection" in error_msg or "timeout" in error_msg):
+                rate_limited = _RATE_LIMIT_RE.search(error_msg) is not None
+                if rate_limited or _NETWORK_RE.search(error_msg):
                     
                     if not retry or retries >= MAX_RETRIES:
-                        if "quota" in error_msg or "rate limit" in error_msg or "exceeded" in error_msg:
+                        if rate_limited:
                             raise Exception("API quota or rate limit exceeded. Please try again later.")
-                        elif "network" in error_msg or "connection" in error_msg or "timeout" in error_msg:
-                            raise Exception("Network connection error. Please check your internet connection.")
+                        else:
+                            raise Exception(self._connection_error_message("Network connection error. Please check your internet connection."))
                     
                     console.print(f"[yellow]Temporary error: {str(e)}. Retrying ({retries+1}/{MAX_RETRIES})...[/yellow]")
-                    time.sleep(RETRY_DELAY)
+                    time.sleep(_backoff_delay(retries, RATE_LIMIT_RETRY_DELAY if rate_limited else RETRY_DELAY, e))
                     retries += 1
                 else:
                     # For other errors, fail immediately
-                    if "invalid" in error_msg and "key" in error_msg:
+                    if _is_invalid_key_error(e):
                         raise Exception("Invalid API key. Please check your key and try again.")
-                    elif "blocked" in error_msg or "content" in error_msg and "policy" in error_msg:
+                    elif _BLOCKED_RE.search(error_msg):
                         raise Exception("Content blocked by API safety filters. Please modify your prompt.")
-                    elif "too long" in error_msg or "token" in error_msg and "limit" in error_msg:
+                    elif _TOO_LONG_RE.search(error_msg):
                         raise Exception("Input too long. Please shorten your prompt.")
                     else:
                         raise Exception(f"Error generating content: {str(e)}")
@@ -269,6 +572,25 @@ class GeminiWrapper:
         # If we've exhausted all retries
         raise Exception("Failed to generate content after multiple attempts. Please try again later.")
     
+    def _generation_config(self, system_prompt, **kwargs):
+        """
+        Build the generation config for a request.
+        
+        Args:
+            system_prompt (str): System instruction for the model
+            **kwargs: Sampling overrides (temperature, top_p, top_k, max_output_tokens)
+            
+        Returns:
+            GenerateContentConfig: Config for the request (shared, do not modify)
+        """
+        return _make_config(
+            system_prompt,
+            kwargs.get("temperature", 0.2),
+            kwargs.get("top_p", 0.8),
+            kwargs.get("top_k", 40),
+            kwargs.get("max_output_tokens", 200),
+        )
+    
     def explain_command(self, command: str, model: str) -> Optional[str]:
         """
         Get an explanation for a shell command.
@@ -280,16 +602,10 @@ class GeminiWrapper:
         Returns:
             Optional[str]: An explanation of what the command does, or None if explanation failed
         """
-        system_prompt = """
-        You are a helpful shell command explainer. Given a shell command, explain what it does in simple terms.
-        Keep your explanation concise but thorough, focusing on potential risks or side effects.
-        Format your response as plain text with no markdown or special formatting.
-        """
-        
         user_prompt = f"Explain this shell command: {command}"
         
         try:
-            response = self.generate_content(model, [system_prompt, user_prompt])
+            response = self.generate_content(model, [EXPLAIN_SYSTEM_PROMPT, user_prompt], **EXPLAIN_PARAMS)
             if response and hasattr(response, 'text'):
                 return response.text.strip()
             return None
@@ -297,39 +613,39 @@ class GeminiWrapper:
             console.print(f"[yellow]Could not generate command explanation: {str(e)}[/yellow]")
             return None
     
-    def list_available_models(self):
+    def list_available_models(self, force_refresh=False):
         """
         List all available Gemini models.
         
+        The list is cached on disk for MODELS_CACHE_TTL seconds, per API key.
+        
+        Args:
+            force_refresh (bool): Ignore the disk cache and ask the API
+        
         Returns:
-            list: List of available model names
+            list: List of available model names (DEFAULT_MODELS if none could be fetched)
         """
+        if not force_refresh:
+            cached = _load_cached_models(self.api_key)
+            if cached:
+                return cached
+        
         try:
-            # Check internet connection before making the API call
-            self._check_internet_connection()
-            
             # Get all available models
             models = self.client.models.list()
             
-            # Filter for Gemini models only
-            gemini_models = []
-            for model in models:
-                # Safely get model name
-                if hasattr(model, 'name') and model.name:
-                    model_name = str(model.name)
-                    if "gemini" in model_name.lower():
-                        # Strip the full path if present
-                        if "/" in model_name:
-                            model_name = model_name.split("/")[-1]
-                        gemini_models.append(model_name)
+            # Keep Gemini models only, with any "models/" path prefix stripped
+            names = (getattr(model, "name", None) for model in models)
+            gemini_models = [name.rsplit("/", 1)[-1] for name in names if name and "gemini" in name.lower()]
             
             # If no models were found, return defaults
             if not gemini_models:
-                return ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-pro"]
-                
+                return DEFAULT_MODELS
+            
+            _save_cached_models(self.api_key, gemini_models)
             return gemini_models
             
         except Exception as e:
             console.print(f"[red]Error listing models: {str(e)}[/red]")
             # Return a default list of models that are likely to be available
-            return ["gemini-2.5-pro", "gemini-2.5-flash", "gemini-2.0-pro"] 
\ No newline at end of file
+            return DEFAULT_MODELS 
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Command Cache Module - Stores generated command plans on disk so repeated prompts skip the API.
+"""
+
+import os
+import time
+import hashlib
+import sqlite3
+
+from . import jsonlib
+
+# Cache database location
+CACHE_DIR = os.path.expanduser("~/.cache/smart-shell")
+CACHE_FILE = os.path.join(CACHE_DIR, "commands.db")
+# Seconds a stored plan is reused for
+CACHE_TTL = 7 * 24 * 60 * 60
+# Most plans kept; the oldest are dropped beyond this
+CACHE_MAX_ENTRIES = 500
+
+_connection = None
+
+def _connect():
+    """Open (once per process) the cache database, creating it if needed."""
+    global _connection
+    if _connection is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        connection = sqlite3.connect(CACHE_FILE)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS commands ("
+            "hash TEXT PRIMARY KEY, model TEXT, commands TEXT, ts REAL)"
+        )
+        _connection = connection
+    return _connection
+
+def make_key(prompt, model, os_id, shell):
+    """
+    Build the cache key for a prompt and the environment its plan was generated for.
+
+    Only whitespace is normalized: case is kept, since "delete Foo.txt" and
+    "delete foo.txt" need different commands.
+
+    Args:
+        prompt (str): The user's natural language prompt
+        model (str): The resolved model name used to generate the plan
+        os_id (str): The OS identifier, e.g. "ubuntu"
+        shell (str): The shell the plan was generated for
+
+    Returns:
+        str: A hex digest identifying the request
+    """
+    normalized = " ".join(prompt.split())
+    return hashlib.sha256("\0".join((model, os_id, shell, normalized)).encode("utf-8")).hexdigest()
+
+def get(key):
+    """
+    Look up a cached command plan.
+
+    Args:
+        key (str): Key returned by make_key
+
+    Returns:
+        list[str] or None: The cached plan, or None on a miss
+    """
+    try:
+        row = _connect().execute(
+            "SELECT commands FROM commands WHERE hash = ? AND ts >= ?", (key, time.time() - CACHE_TTL)
+        ).fetchone()
+    except (sqlite3.Error, OSError):
+        return None
+    if row is None:
+        return None
+    try:
+        return jsonlib.loads(row[0])
+    except jsonlib.JSONDecodeError:
+        return None
+
+def put(key, model, commands):
+    """
+    Store a generated command plan.
+
+    Args:
+        key (str): Key returned by make_key
+        model (str): The model used to generate the plan
+        commands (list[str]): The generated plan
+    """
+    try:
+        connection = _connect()
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO commands (hash, model, commands, ts) VALUES (?, ?, ?, ?)",
+                (key, model, jsonlib.dumps(commands), time.time()),
+            )
+            # Drop expired plans and anything beyond the size cap, oldest first
+            connection.execute("DELETE FROM commands WHERE ts < ?", (time.time() - CACHE_TTL,))
+            connection.execute(
+                "DELETE FROM commands WHERE hash IN "
+                "(SELECT hash FROM commands ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+                (CACHE_MAX_ENTRIES,),
+            )
+    except (sqlite3.Error, OSError):
+        pass
+
+def delete(key):
+    """
+    Drop a cached command plan, e.g. after it failed to execute.
+
+    Args:
+        key (str): Key returned by make_key
+    """
+    try:
+        connection = _connect()
+        with connection:
+            connection.execute("DELETE FROM commands WHERE hash = ?", (key,))
+    except (sqlite3.Error, OSError):
+        pass
+
+def clear():
+    """
+    Drop every cached command plan.
+
+    Returns:
+        int: The number of plans removed, or 0 if the cache could not be opened
+    """
+    try:
+        connection = _connect()
+        with connection:
+            return connection.execute("DELETE FROM commands").rowcount
+    except (sqlite3.Error, OSError):
+        return 0
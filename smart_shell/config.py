@@ -3,63 +3,266 @@ Config Module - Handles loading and saving of configuration data.
 """
 
 import os
-import json
+import stat
 import base64
-import binascii
-from rich.console import Console
+from functools import lru_cache, wraps
 
-console = Console()
+from . import jsonlib
+
+@lru_cache(maxsize=None)
+def _console():
+    """Creates the rich Console on first use; it is only needed to report errors."""
+    from rich.console import Console
+    return Console()
+
+# Set to profile config access with pyinstrument (sampling interval in seconds
+# from SMART_SHELL_PROFILE_INTERVAL); reports are appended to profile.txt
+ENV_PROFILE = "SMART_SHELL_PROFILE"
+ENV_PROFILE_INTERVAL = "SMART_SHELL_PROFILE_INTERVAL"
+
+def _maybe_profile(func):
+    """Profiles every call of `func` when profiling is enabled; otherwise returns it unchanged."""
+    if not os.environ.get(ENV_PROFILE):
+        return func
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        return func
+    try:
+        interval = float(os.environ.get(ENV_PROFILE_INTERVAL) or 0.001)
+    except ValueError:
+        interval = 0.001
+
+    @wraps(func)
+    def profiled(*args, **kwargs):
+        profiler = Profiler(interval=interval)
+        profiler.start()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.stop()
+            try:
+                with open(os.path.join(_config_dir(), "profile.txt"), "a") as f:
+                    f.write(profiler.output_text())
+            except OSError:
+                pass
+    return profiled
+
+# Configuration paths, resolved on first use rather than at import
+@lru_cache(maxsize=1)
+def _config_dir():
+    """Returns the configuration directory."""
+    return os.path.expanduser("~/.config/smart-shell")
+
+@lru_cache(maxsize=1)
+def _config_file():
+    """Returns the path of the configuration file."""
+    return os.path.join(_config_dir(), "config.json")
+
+_LAZY_PATHS = {"CONFIG_DIR": _config_dir, "CONFIG_FILE": _config_file}
+
+def __getattr__(name):
+    """Resolves CONFIG_DIR and CONFIG_FILE lazily (PEP 562)."""
+    if name in _LAZY_PATHS:
+        return _LAZY_PATHS[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Configuration paths
-CONFIG_DIR = os.path.expanduser("~/.config/smart-shell")
-CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 ENV_API_KEY = "SMART_SHELL_API_KEY"
 
-def load_config():
-    """Loads configuration from file."""
-    if not os.path.exists(CONFIG_FILE):
+# Model used until one is chosen during setup or with !model
+_DEFAULT_MODEL = "models/gemini-2.5-flash"
+
+# System keyring entry for the sudo password (used when keyring is installed)
+KEYRING_SERVICE = "smart-shell"
+KEYRING_USERNAME = "sudo"
+
+# Last parsed config, keyed by the file's (mtime, size) so repeated calls
+# skip the read and parse while the file is unchanged.
+_config_cache = {"key": None, "data": None}
+
+def _read_config():
+    """Returns the parsed config, shared with the cache; callers must not modify it."""
+    try:
+        st = os.stat(_config_file())
+    except FileNotFoundError:
         return {}
+    key = (st.st_mtime_ns, st.st_size)
+    if _config_cache["key"] == key:
+        return _config_cache["data"]
     try:
-        with open(CONFIG_FILE, "r") as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError) as e:
-        console.print(f"[yellow]Warning: Could not load config file: {e}[/yellow]")
+        with open(_config_file(), "rb") as f:
+            config = jsonlib.loads(f.read())
+    except FileNotFoundError:
+        # Removed between the stat and the open
+        return {}
+    except (jsonlib.JSONDecodeError, OSError) as e:
+        _console().print(f"[yellow]Warning: Could not load config file: {e}[/yellow]")
         return {}
+    _config_cache["key"] = key
+    _config_cache["data"] = config
+    return config
+
+@_maybe_profile
+def load_config():
+    """Loads configuration from file."""
+    # Callers are free to mutate the returned dict, so hand out a copy
+    return dict(_read_config())
+
+def clear_config_cache():
+    """Forgets the cached config so the next load_config re-reads the file."""
+    _config_cache["key"] = None
+    _config_cache["data"] = None
+
+load_config.cache_clear = clear_config_cache
+
+def write_atomic(path, data):
+    """
+    Replace a file's contents in one atomic step.
+    
+    The data goes to a uniquely named temporary file in the same directory,
+    which then replaces `path`, so readers see the old or the new contents,
+    never a partial write, and concurrent writers don't share a temp file.
+    The new file keeps the old one's permissions, or is private (0600) if
+    there was none.
+    
+    Args:
+        path (str): The file to write
+        data (bytes): The new contents
+    
+    Raises:
+        OSError: If the file could not be written; `path` is left untouched
+    """
+    import tempfile
 
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o600
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=os.path.basename(path) + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # Set the mode before any data is written; mkstemp already made it 0600
+            if hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+# Set once save_config has created the config directory, so later saves skip the makedirs
+_config_dir_ready = False
+
+@_maybe_profile
 def save_config(config):
     """Saves configuration to file."""
-    os.makedirs(CONFIG_DIR, exist_ok=True)
+    global _config_dir_ready
+    config_file = _config_file()
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=2)
-    except IOError as e:
-        console.print(f"[bold red]Error: Could not save config file: {e}[/bold red]")
+        if not _config_dir_ready:
+            os.makedirs(_config_dir(), exist_ok=True)
+            _config_dir_ready = True
+        # Write the encoder's bytes directly, with no str round trip, so a
+        # crash mid-write never leaves a truncated config behind; the file
+        # holds the API key, so it stays private
+        write_atomic(config_file, jsonlib.dumps_bytes(config, pretty=True))
+        # What we just wrote is the current config, so stamp it into the
+        # cache instead of re-parsing the file on the next load
+        st = os.stat(config_file)
+    except OSError as e:
+        _console().print(f"[bold red]Error: Could not save config file: {e}[/bold red]")
+        clear_config_cache()
+        return
+    _config_cache["key"] = (st.st_mtime_ns, st.st_size)
+    _config_cache["data"] = dict(config)
+
+def update_config(**changes):
+    """Sets the given keys in the config file with a single load and save."""
+    config = load_config()
+    config.update(changes)
+    save_config(config)
 
 def get_current_model():
     """Gets the current default model from the config file."""
-    config = load_config()
-    return config.get("default_model", "models/gemini-2.5-flash")
+    return _read_config().get("default_model", _DEFAULT_MODEL)
 
 def save_model(model_name):
     """Saves the selected model to the config file."""
-    config = load_config()
-    config["default_model"] = model_name
-    save_config(config)
+    update_config(default_model=model_name)
 
+@lru_cache(maxsize=1)
+def _decode_password(encoded_pass):
+    """Decodes a stored sudo password; keyed on the encoded value, so a new password is decoded afresh."""
+    try:
+        return base64.b64decode(encoded_pass).decode('utf-8')
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+@lru_cache(maxsize=None)
+def _keyring():
+    """Imports keyring on first use; None if it is not installed."""
+    try:
+        import keyring
+    except ImportError:
+        return None
+    return keyring
+
+@lru_cache(maxsize=1)
+def _keyring_password():
+    """Reads the sudo password from the system keyring once per process."""
+    keyring = _keyring()
+    if keyring is None:
+        return None
+    try:
+        return keyring.get_password(KEYRING_SERVICE, KEYRING_USERNAME)
+    except Exception:
+        return None
+
+@_maybe_profile
 def get_sudo_password():
-    """Gets the decoded sudo password from the config file."""
-    config = load_config()
+    """Gets the sudo password from the system keyring or the config file."""
+    config = _read_config()
+    if config.get("sudo_password_keyring"):
+        return _keyring_password()
     encoded_pass = config.get("sudo_password_b64")
     if encoded_pass:
-        try:
-            return base64.b64decode(encoded_pass).decode('utf-8')
-        except (binascii.Error, UnicodeDecodeError):
-            return None
+        return _decode_password(encoded_pass)
     return None
 
+def store_sudo_password(config, password):
+    """Stores the sudo password in the system keyring, or base64-encoded in `config` if no keyring is usable."""
+    _keyring_password.cache_clear()
+    keyring = _keyring()
+    if keyring is not None:
+        try:
+            keyring.set_password(KEYRING_SERVICE, KEYRING_USERNAME, password)
+        except Exception:
+            pass
+        else:
+            # Only a marker stays in the config file
+            config.pop("sudo_password_b64", None)
+            config["sudo_password_keyring"] = True
+            return
+    config.pop("sudo_password_keyring", None)
+    config["sudo_password_b64"] = base64.b64encode(password.encode('utf-8')).decode('utf-8')
+
+def clear_sudo_password(config):
+    """Removes the stored sudo password from `config` and the system keyring."""
+    config.pop("sudo_password_b64", None)
+    if config.pop("sudo_password_keyring", None):
+        _keyring_password.cache_clear()
+        keyring = _keyring()
+        if keyring is not None:
+            try:
+                keyring.delete_password(KEYRING_SERVICE, KEYRING_USERNAME)
+            except Exception:
+                pass
+
 def save_sudo_password(password):
-    """Saves the sudo password to the config file in base64 encoding."""
+    """Saves the sudo password to the system keyring, falling back to base64 in the config file."""
     config = load_config()
-    encoded_pass = base64.b64encode(password.encode('utf-8')).decode('utf-8')
-    config["sudo_password_b64"] = encoded_pass
-    save_config(config) 
\ No newline at end of file
+    store_sudo_password(config, password)
+    save_config(config)
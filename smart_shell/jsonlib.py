@@ -0,0 +1,81 @@
+"""
+JSON Module - Fast JSON encoding/decoding with a stdlib fallback.
+
+Uses orjson or ujson when one of them is installed and falls back to the
+standard library json module otherwise, so none is a hard dependency.
+Without orjson, documents are parsed with pysimdjson if it is installed.
+"""
+
+import json
+
+try:
+    import orjson
+
+    BACKEND = "orjson"
+    JSONDecodeError = orjson.JSONDecodeError
+
+    def loads(data):
+        """Parse JSON from a str or bytes object."""
+        return orjson.loads(data)
+
+    def dumps(obj, pretty=False):
+        """Serialize an object to a JSON string, indented if `pretty` is set."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0).decode("utf-8")
+
+    def dumps_bytes(obj, pretty=False):
+        """Serialize an object to UTF-8 encoded JSON bytes, compact unless `pretty` is set (indented, newline-terminated)."""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE if pretty else 0)
+
+except ImportError:
+    try:
+        import ujson
+
+        BACKEND = "ujson"
+        JSONDecodeError = ValueError
+
+        def loads(data):
+            """Parse JSON from a str or bytes object."""
+            return ujson.loads(data)
+
+        def dumps(obj, pretty=False):
+            """Serialize an object to a JSON string, indented if `pretty` is set."""
+            return ujson.dumps(obj, indent=2 if pretty else 0, ensure_ascii=False, escape_forward_slashes=False)
+
+        def dumps_bytes(obj, pretty=False):
+            """Serialize an object to UTF-8 encoded JSON bytes, compact unless `pretty` is set (indented, newline-terminated)."""
+            if pretty:
+                return (ujson.dumps(obj, indent=2, ensure_ascii=False, escape_forward_slashes=False) + "\n").encode("utf-8")
+            return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False).encode("utf-8")
+
+    except ImportError:
+        BACKEND = "json"
+        JSONDecodeError = json.JSONDecodeError
+
+        def loads(data):
+            """Parse JSON from a str or bytes object."""
+            return json.loads(data)
+
+        def dumps(obj, pretty=False):
+            """Serialize an object to a JSON string, indented if `pretty` is set."""
+            return json.dumps(obj, indent=2 if pretty else None)
+
+        def dumps_bytes(obj, pretty=False):
+            """Serialize an object to UTF-8 encoded JSON bytes, compact unless `pretty` is set (indented, newline-terminated)."""
+            if pretty:
+                return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+            return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+if BACKEND != "orjson":
+    # pysimdjson parses faster than ujson and the stdlib on larger documents;
+    # without orjson, use it for decoding and keep the encoder chosen above
+    try:
+        import simdjson
+    except ImportError:
+        pass
+    else:
+        BACKEND = f"simdjson+{BACKEND}"
+        JSONDecodeError = ValueError
+
+        def loads(data):
+            """Parse JSON from a str or bytes object."""
+            return simdjson.loads(data)
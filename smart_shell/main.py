@@ -1,55 +1,118 @@
 """
-Smart-Shell - An intelligent terminal assistant that converts nat        console.print("\n[bold green]Usage Examples:[/bold green]")
-        console.print("  smart-shell run --model gemini-2.5-flash \"list all files\"")
-        console.print("  smart-shell run --model gemini-2.5-pro \"complex analysis task\"")
-        console.print("  !model gemini-2.5-flash  (in interactive mode)")
-        
-        console.print("\n[bold yellow]💡 Tips:[/bold yellow]")
-        console.print("  • Use [cyan]!models free[/cyan] to see only free models")
-        console.print("  • Use [cyan]!models premium[/cyan] to see premium models with pricing")
-        console.print("  • Use [cyan]!models refresh[/cyan] to update model info from web")
-        console.print("  • Premium models show cost warnings before switching")guage into executable Bash/Zsh commands.
+Smart-Shell - An intelligent terminal assistant that converts natural language into executable Bash/Zsh commands.
 """
 
 import sys
 import os
+import re
+import time
+import itertools
 import click
 import signal
-import readline
-import atexit
-import json
+import threading
 import subprocess
-import requests
-import toml
 from pathlib import Path
+from collections import deque
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
-from rich.prompt import Prompt, Confirm
-from rich.markdown import Markdown
-from rich.syntax import Syntax
-from rich.table import Table
-
-from .shell_builder import generate_command_plan, display_banner
-from .safety import check_command_safety
-from .setup_logic import setup_config
-from .config import load_config, ENV_API_KEY, get_current_model, save_model
+from rich.prompt import Confirm
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Heavier modules (shell_builder, safety, ai_wrapper, model_info, setup_logic,
+# readline, requests, tomllib and the rich Markdown/Syntax renderers) are
+# imported inside the functions that need them so that `--help`, `version`
+# and friends start fast.
+from . import jsonlib
+from .config import load_config, ENV_API_KEY, get_current_model, save_model, write_atomic
 from .utils import execute_command, print_plan_preview, reset_sudo_password, log_error, ERROR_LOG_FILE, get_os_info, detect_shell
-from .ai_wrapper import get_wrapper
-from .model_info import model_info
-from .model_info import model_info
 
 console = Console()
 
-# History file for command storage
+# History files for command storage. Both are JSONL (one JSON object per
+# line) so that recording a command is a single append instead of a rewrite
+# of the whole history. Execution results are appended to a separate status
+# file and merged back in when the history is read.
 HISTORY_DIR = os.path.expanduser("~/.local/share/smart-shell")
-HISTORY_FILE = os.path.join(HISTORY_DIR, "history.json")
+HISTORY_FILE = os.path.join(HISTORY_DIR, "history.jsonl")
+HISTORY_STATUS_FILE = os.path.join(HISTORY_DIR, "history_status.jsonl")
+# History written by older versions as a single JSON array; converted to
+# JSONL the first time the history is used, then kept as a .bak file
+LEGACY_HISTORY_FILE = os.path.join(HISTORY_DIR, "history.json")
+_history_migrated = False
+# Lock file that serializes history writes across concurrent sessions
+HISTORY_LOCK_FILE = HISTORY_FILE + ".lock"
+
+# Buffer size for history appends, so each record is written in one syscall
+HISTORY_WRITE_BUFFER = 1 << 16
+# When loading the last N history entries, their results are looked up in
+# the last N * HISTORY_STATUS_MARGIN status records first (other sessions
+# and late results interleave), and only then in the whole status file
+HISTORY_STATUS_MARGIN = 20
+# Block size for reading the status file backwards
+HISTORY_TAIL_BLOCK = 1 << 16
+
+# Prompts that end interactive mode (compared lowercased)
+_EXIT_COMMANDS = frozenset({"exit", "quit", "bye", "q"})
+
+# Smart-Shell CLI commands that should be run outside interactive mode,
+# matched anywhere in a prompt
+_SMART_SHELL_CMD_RE = re.compile(
+    r"\bsmart-shell\s+(?:setup|--setup|config|version|--version|-v|models|--models|--list-models"
+    r"|help|--help|-h|history|--history)\b",
+    re.IGNORECASE,
+)
+
+# Interactive prompt history kept by readline. The history file is truncated
+# to READLINE_HISTORY_LENGTH lines when it is written; the in-memory history
+# of a session is not capped
+READLINE_HISTORY_LENGTH = 2000
+READLINE_HISTORY_MAX_BYTES = 256 * 1024
+
+# Latest released version as last fetched from GitHub (with its ETag), reused
+# by !update for UPDATE_CACHE_TTL seconds (`!update --force` always asks GitHub)
+UPDATE_CACHE_FILE = os.path.expanduser("~/.cache/smart-shell/update_cache.json")
+UPDATE_CACHE_TTL = 3600
+# (connect, read) timeouts for update checks, so a dead network fails fast
+HTTP_TIMEOUT = (3.05, 10)
+
+# Model lists fetched in this process, keyed by API key: (monotonic time, models).
+# Saves `!models`, `!models free`, ... from each listing the models again.
+MODELS_CACHE_TTL = 600
+_models_cache = {}
+
+# Per-process sequence number that keeps history IDs unique within a process
+_history_counter = itertools.count()
+
+# Set this environment variable to hide the banner, like --no-banner
+ENV_NO_BANNER = "SMART_SHELL_NO_BANNER"
+_banner_enabled = True
+
+def show_banner():
+    """Display the banner, unless output is not a terminal or it was turned off."""
+    if not _banner_enabled or not console.is_terminal or os.environ.get(ENV_NO_BANNER):
+        return
+    from .shell_builder import display_banner
+
+    display_banner()
 
 @click.group(invoke_without_command=True)
 @click.pass_context
 @click.option("--list-models", is_flag=True, help="List all supported AI models")
-def cli(ctx, list_models):
+@click.option("--no-banner", is_flag=True, help="Don't display the Smart-Shell banner")
+def cli(ctx, list_models, no_banner):
     """Smart-Shell: Convert natural language to Bash or Zsh commands using AI."""
+    global _banner_enabled
+    if no_banner:
+        _banner_enabled = False
+
     if list_models:
         display_models()
         return
@@ -58,8 +121,39 @@ def cli(ctx, list_models):
         # No need to show banner again, just invoke the run command
         ctx.invoke(run, prompt=None, dry_run=False, model=None, interactive=True)
 
-def display_models():
-    """Display a list of supported models by fetching them from the API."""
+def _get_models_cached(wrapper, api_key, force_refresh=False):
+    """
+    List the available models, reusing this process's last answer for MODELS_CACHE_TTL seconds.
+    
+    Args:
+        wrapper: The AI wrapper for the API key
+        api_key (str): The API key the list belongs to
+        force_refresh (bool): Ignore both this cache and the wrapper's disk cache
+    
+    Returns:
+        list: Available model names
+    """
+    cached = _models_cache.get(api_key)
+    if not force_refresh and cached and time.monotonic() - cached[0] < MODELS_CACHE_TTL:
+        return cached[1]
+    from .ai_wrapper import DEFAULT_MODELS
+
+    models = wrapper.list_available_models(force_refresh=force_refresh)
+    # The defaults stand in for a failed or empty listing; ask again next time
+    if models is not DEFAULT_MODELS:
+        _models_cache[api_key] = (time.monotonic(), models)
+    return models
+
+def display_models(force_refresh=False):
+    """
+    Display a list of supported models by fetching them from the API.
+    
+    Args:
+        force_refresh (bool): Bypass the cached model list
+    """
+    from .ai_wrapper import get_wrapper
+    from .model_info import model_info
+
     console.print("[blue]Checking for API key...[/blue]")
     api_key = os.environ.get(ENV_API_KEY) or load_config().get("api_key")
     if not api_key:
@@ -69,9 +163,9 @@ def display_models():
 
     try:
         wrapper = get_wrapper(api_key)
-        models = wrapper.list_available_models()
+        models = _get_models_cached(wrapper, api_key, force_refresh)
         
-        display_banner()
+        show_banner()
         
         # Use the new model info system to display comprehensive model information
         model_info.display_model_table(models)
@@ -94,7 +188,8 @@ def display_models():
 @click.option("--model", "-m", help="Specify model to use for this command")
 @click.option("--interactive", "-i", is_flag=True, help="Run in interactive mode")
 @click.option("yes", "-y", is_flag=True, help="Automatically confirm all prompts")
-def run(prompt, dry_run, model, interactive, yes):
+@click.option("--no-cache", is_flag=True, help="Generate a fresh plan instead of reusing a cached one")
+def run(prompt, dry_run, model, interactive, yes, no_cache):
     """Convert natural language to Bash or Zsh commands."""
     # Don't display banner again - it's already shown in the main CLI function
     
@@ -115,7 +210,7 @@ def run(prompt, dry_run, model, interactive, yes):
         console.print(f"[bold blue]Detected shell:[/bold blue] {shell_type}")
     
     if interactive:
-        run_interactive_mode(dry_run, model, api_key, config, yes, shell_type)
+        run_interactive_mode(dry_run, model, api_key, config, yes, shell_type, use_cache=not no_cache)
         return
     
     if not prompt:
@@ -128,50 +223,62 @@ def run(prompt, dry_run, model, interactive, yes):
 
     # Generate command from natural language
     user_prompt = " ".join(prompt)
-    process_prompt(user_prompt, dry_run, model, api_key, config, yes)
+    process_prompt(user_prompt, dry_run, model, api_key, config, yes, use_cache=not no_cache)
+
+def _bucket_by_status(command_plan, safety_results):
+    """
+    Group a plan's commands by their safety status.
+    
+    Args:
+        command_plan (list): The commands of the plan
+        safety_results (list): The safety result for each command
+    
+    Returns:
+        dict: Status -> list of (command, safety result) pairs, in plan order
+    """
+    buckets = {}
+    for cmd, safety in zip(command_plan, safety_results):
+        buckets.setdefault(safety["status"], []).append((cmd, safety))
+    return buckets
+
+def process_prompt(user_prompt, dry_run, model, api_key, config, auto_yes=False, use_cache=True):
+    """Process a single user prompt; `use_cache=False` always asks the AI for a new plan."""
+    from .shell_builder import generate_command_plan, resolve_shell_type, DEFAULT_MODEL
+    from .safety import check_command_safety_batch
+    from . import cmd_cache
 
-def process_prompt(user_prompt, dry_run, model, api_key, config, auto_yes=False):
-    """Process a single user prompt."""
     console.print(f"\n[bold blue]Prompt:[/bold blue] {user_prompt}")
     
     try:
-        # Generate a command plan (list of commands)
-        console.print("[blue]Generating execution plan...[/blue]")
-        command_plan = generate_command_plan(user_prompt, api_key, model, os_info=get_os_info())
+        # Reuse the plan from an identical earlier prompt for the same model,
+        # OS and shell if we have one
+        model = model or DEFAULT_MODEL
+        os_info = get_os_info()
+        cache_key = cmd_cache.make_key(user_prompt, model, os_info["id"], resolve_shell_type(os_info))
+        command_plan = cmd_cache.get(cache_key) if use_cache else None
+        if command_plan:
+            console.print("[blue]Using cached execution plan (!cache clear or --no-cache to regenerate).[/blue]")
+        else:
+            # Generate a command plan (list of commands)
+            command_plan = run_in_background(
+                "[blue]Generating execution plan...[/blue]",
+                generate_command_plan, user_prompt, api_key, model, os_info=os_info
+            )
 
-        if not command_plan:
-            console.print("[yellow]The AI returned an empty plan. This could be due to a safety block or an impossible request. Please try again.[/yellow]")
-            return
+            if not command_plan:
+                console.print("[yellow]The AI returned an empty plan. This could be due to a safety block or an impossible request. Please try again.[/yellow]")
+                return
+
+            cmd_cache.put(cache_key, model, command_plan)
 
-        safety_results = [check_command_safety(cmd) for cmd in command_plan]
+        safety_results = check_command_safety_batch(command_plan)
         
         # Display the plan preview
         print_plan_preview(command_plan, safety_results)
         
-        # Check if any command in the plan is risky
-        blocked_commands = [cmd for cmd, safety in zip(command_plan, safety_results) if safety["status"] == "blocked"]
-        if blocked_commands:
-            console.print("[bold red]⛔ BLOCKED:[/bold red]")
-            for cmd in blocked_commands:
-                console.print(f"   {cmd}")
-            
-            # Ask if user wants to edit the command
-            if Prompt.ask("Would you like to edit the command?", choices=["y", "n"], default="y") == "y":
-                edited_command = Prompt.ask("Enter modified command", default=blocked_commands[0])
-                if edited_command != blocked_commands[0]:
-                    # Check safety of edited command
-                    safety_result = check_command_safety(edited_command)
-                    if safety_result["status"] == "blocked":
-                        console.print(f"[bold red]⛔ Edited command is still blocked:[/bold red]")
-                        console.print(f"[red]Reason: {safety_result['reason']}[/red]")
-                        return False
-                    command_plan = [edited_command]
-                    console.print("[green]Using edited command.[/green]")
-                else:
-                    return False
-            else:
-                return False
-            
+        # Group the plan's commands by safety status in one pass
+        buckets = _bucket_by_status(command_plan, safety_results)
+        
         # Execute or dry run
         if dry_run:
             console.print("[yellow]Dry run mode - command not executed[/yellow]")
@@ -180,26 +287,24 @@ def process_prompt(user_prompt, dry_run, model, api_key, config, auto_yes=False)
             return True
         else:
             # Check for HIGH and MEDIUM risk commands and ask for confirmation
-            high_risk_commands = [cmd for cmd, safety in zip(command_plan, safety_results) if safety["status"] == "high"]
-            medium_risk_commands = [cmd for cmd, safety in zip(command_plan, safety_results) if safety["status"] == "medium"]
+            high_risk = buckets.get("high")
+            medium_risk = buckets.get("medium")
             
-            if high_risk_commands and not auto_yes:
+            if high_risk and not auto_yes:
                 console.print(f"[bold red]⚠️  HIGH RISK COMMAND DETECTED![/bold red]")
-                for cmd, safety in zip(command_plan, safety_results):
-                    if safety["status"] == "high":
-                        console.print(f"[red]Command:[/red] {cmd}")
-                        console.print(f"[red]Risk:[/red] {safety['notes']}")
+                for cmd, safety in high_risk:
+                    console.print(f"[red]Command:[/red] {cmd}")
+                    console.print(f"[red]Risk:[/red] {safety['notes']}")
                 
                 if not Confirm.ask("This command has HIGH RISK. Do you want to proceed?", choices=["y", "n"], default="n"):
                     console.print("[yellow]Command execution cancelled for safety.[/yellow]")
                     return False
             
-            elif medium_risk_commands and not auto_yes:
+            elif medium_risk and not auto_yes:
                 console.print(f"[bold yellow]⚠️  MEDIUM RISK COMMAND DETECTED![/bold yellow]")
-                for cmd, safety in zip(command_plan, safety_results):
-                    if safety["status"] == "medium":
-                        console.print(f"[yellow]Command:[/yellow] {cmd}")
-                        console.print(f"[yellow]Risk:[/yellow] {safety['notes']}")
+                for cmd, safety in medium_risk:
+                    console.print(f"[yellow]Command:[/yellow] {cmd}")
+                    console.print(f"[yellow]Risk:[/yellow] {safety['notes']}")
                 
                 if not Confirm.ask("This command has MEDIUM RISK. Do you want to proceed?", choices=["y", "n"], default="n"):
                     console.print("[yellow]Command execution cancelled for safety.[/yellow]")
@@ -214,6 +319,10 @@ def process_prompt(user_prompt, dry_run, model, api_key, config, auto_yes=False)
             # Update history with execution result
             update_history_result(history_id, success)
             
+            # Don't keep serving a plan that failed
+            if not success:
+                cmd_cache.delete(cache_key)
+            
             return success
             
     except KeyboardInterrupt:
@@ -224,26 +333,113 @@ def process_prompt(user_prompt, dry_run, model, api_key, config, auto_yes=False)
         console.print("[yellow]If this is an API error, check your API key and internet connection.[/yellow]")
         return False
 
-def run_interactive_mode(dry_run, model, api_key, config, auto_yes=False, shell_type="bash"):
+def run_in_background(status, func, *args, **kwargs):
+    """
+    Run a blocking call in a background thread while showing a spinner.
+    
+    Ctrl+C raises KeyboardInterrupt in the caller straight away, even in
+    interactive mode, and the abandoned call is left to finish in its daemon
+    thread so the REPL can carry on.
+    
+    Args:
+        status (str): Message shown next to the spinner
+        func (callable): The function to run
+        *args, **kwargs: Arguments passed to `func`
+        
+    Returns:
+        The return value of `func`; exceptions raised by it are re-raised.
+    """
+    future = Future()
+    
+    def worker():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(func(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=worker, daemon=True).start()
+    
+    # Interactive mode exits on SIGINT; while waiting we only want to abandon the call
+    previous_handler = signal.signal(signal.SIGINT, signal.default_int_handler)
+    try:
+        with console.status(status):
+            return future.result()
+    except KeyboardInterrupt:
+        future.cancel()
+        raise
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+def _save_readline_history(readline, path, start_length, start_size):
+    """
+    Save the prompts entered this session to the readline history file.
+    
+    New lines are appended when possible; the whole file (trimmed to
+    READLINE_HISTORY_LENGTH lines) is only rewritten once it has grown past
+    READLINE_HISTORY_MAX_BYTES or if appending is not supported.
+    
+    Args:
+        readline: The readline module
+        path (str): The history file
+        start_length (int): History length after the file was loaded
+        start_size (int): Size of the file when it was loaded, in bytes
+    """
+    added = readline.get_current_history_length() - start_length
+    try:
+        if start_size and start_size < READLINE_HISTORY_MAX_BYTES and hasattr(readline, "append_history_file"):
+            if added > 0:
+                readline.append_history_file(added, path)
+        else:
+            readline.write_history_file(path)
+    except OSError:
+        pass
+
+def _warm_up_api(api_key):
+    """Create the wrapper for an API key and open its connection; failures are left to the first prompt."""
+    import importlib.util
+    from .ai_wrapper import get_wrapper
+
+    # Never let the wrapper's install-on-import fallback run in the background
+    if importlib.util.find_spec("google.genai") is None:
+        return
+    try:
+        get_wrapper(api_key).warm_up()
+    except BaseException:
+        # get_wrapper exits on setup errors; the first prompt reports them instead
+        pass
+
+def run_interactive_mode(dry_run, model, api_key, config, auto_yes=False, shell_type="bash", use_cache=True):
     """Run Smart-Shell in interactive mode until user exits."""
+    import readline
+    import atexit
+
     # Set up history directory
     os.makedirs(HISTORY_DIR, exist_ok=True)
     
-    # Set up readline history
+    # Set up readline history; the file is truncated to READLINE_HISTORY_LENGTH
+    # lines on save
     readline_history_file = os.path.join(HISTORY_DIR, "readline_history")
+    readline.set_history_length(READLINE_HISTORY_LENGTH)
     try:
+        history_size = os.stat(readline_history_file).st_size
         readline.read_history_file(readline_history_file)
     except FileNotFoundError:
-        pass
+        history_size = 0
     
     # Save readline history on exit
-    atexit.register(readline.write_history_file, readline_history_file)
+    atexit.register(_save_readline_history, readline, readline_history_file,
+                    readline.get_current_history_length(), history_size)
     
     # Display the banner and welcome message
     from .shell_builder import display_banner, display_welcome_message
     display_banner()
     display_welcome_message(shell_type)
     
+    # Connect to the API in the background while the user types the first prompt
+    threading.Thread(target=_warm_up_api, args=(api_key,), daemon=True).start()
+    
     # Handle Ctrl+C gracefully
     def signal_handler(sig, frame):
         console.print("\n[green]Exiting Smart-Shell. Goodbye![/green]")
@@ -253,19 +449,16 @@ def run_interactive_mode(dry_run, model, api_key, config, auto_yes=False, shell_
     
     # Main interactive loop
     current_model = model or get_current_model()
+    prompt_text = _interactive_prompt(current_model)
     try:
         while True:
             # Get user input with enhanced prompt showing current model
             try:
-                # Extract model name for display (remove 'models/' prefix if present)
-                display_model = current_model.replace('models/', '') if current_model else 'gemini-2.5-flash'
-                
                 # Create a truly protected prompt using a custom approach
                 def get_protected_input():
                     # Use input() with the prompt parameter to make it non-deletable
                     try:
-                        # Create the prompt string without Rich formatting for input()
-                        prompt_text = f"\nSmart-Shell ({display_model}): "
+                        # The prompt string has no Rich formatting for input()
                         line = input(prompt_text)
                         # Only strip trailing whitespace, preserve intentional leading spaces and line breaks
                         return line.rstrip()
@@ -274,17 +467,15 @@ def run_interactive_mode(dry_run, model, api_key, config, auto_yes=False, shell_
                     except EOFError:
                         raise
                 
+                # input() adds non-empty lines to the readline history itself
                 user_prompt = get_protected_input()
-                
-                if user_prompt:  # Only add non-empty prompts to history
-                    readline.add_history(user_prompt)
             except EOFError:
                 # Handle Ctrl+D
                 console.print("\n[green]Exiting Smart-Shell. Goodbye![/green]")
                 break
             
             # Check for exit commands
-            if user_prompt.lower() in ["exit", "quit", "bye", "q"]:
+            if user_prompt.lower() in _EXIT_COMMANDS:
                 console.print("[green]Exiting Smart-Shell. Goodbye![/green]")
                 break
             
@@ -293,117 +484,131 @@ def run_interactive_mode(dry_run, model, api_key, config, auto_yes=False, shell_
                 continue
             
             # Check for Smart-Shell CLI commands that should be run outside
-            smart_shell_commands = [
-                "smart-shell setup", "smart-shell --setup", "smart-shell config",
-                "smart-shell version", "smart-shell --version", "smart-shell -v",
-                "smart-shell models", "smart-shell --models", "smart-shell --list-models",
-                "smart-shell help", "smart-shell --help", "smart-shell -h",
-                "smart-shell history", "smart-shell --history"
-            ]
-            
-            user_prompt_lower = user_prompt.lower().strip()
-            if any(cmd in user_prompt_lower for cmd in smart_shell_commands):
+            if _SMART_SHELL_CMD_RE.search(user_prompt):
                 console.print(f"[yellow]💡 The command '{user_prompt}' should be run outside Smart-Shell.[/yellow]")
                 console.print("[yellow]Please exit Smart-Shell first (type 'exit' or press Ctrl+C) and then run this command.[/yellow]")
                 continue
                 
             # Check for special commands
             if user_prompt.startswith("!"):
-                current_model = handle_special_command(user_prompt, current_model)
+                new_model = handle_special_command(user_prompt, current_model)
+                if new_model != current_model:
+                    # Rebuild the prompt only when the model actually changed
+                    current_model = new_model
+                    prompt_text = _interactive_prompt(current_model)
                 continue
                 
             # Process the prompt
-            process_prompt(user_prompt, dry_run, current_model, api_key, config, auto_yes)
+            process_prompt(user_prompt, dry_run, current_model, api_key, config, auto_yes, use_cache)
             
     except Exception as e:
         console.print(f"\n[bold red]Error in interactive mode:[/bold red] {str(e)}")
         console.print("[green]Exiting Smart-Shell.[/green]")
         return
 
+def _interactive_prompt(current_model):
+    """Build the input() prompt showing the model name without its 'models/' prefix."""
+    display_model = current_model.replace('models/', '') if current_model else 'gemini-2.5-flash'
+    return f"\nSmart-Shell ({display_model}): "
+
 def handle_special_command(command, current_model):
     """Handle special commands in interactive mode."""
     cmd = command.lower().strip()
     
-    if cmd == "!history":
-        show_command_history()
-    elif cmd == "!clear":
-        os.system("clear" if os.name == "posix" else "cls")
-        display_banner()
-    elif cmd == "!help":
-        show_help()
-    elif cmd == "!models":
-        display_models()
-    elif cmd == "!models refresh":
-        # Refresh model information from web
-        console.print("[blue]Refreshing model information from web sources...[/blue]")
-        model_info.refresh_model_info()
-        display_models()
-    elif cmd.startswith("!models "):
-        # Handle filtered model display
-        parts = cmd.split(" ", 1)
-        if len(parts) > 1:
-            filter_type = parts[1].strip().lower()
-            
-            if filter_type == "refresh":
-                model_info.refresh_model_info()
-                display_models()
-                return current_model
-            
-            try:
-                wrapper = get_wrapper(os.environ.get(ENV_API_KEY) or load_config().get("api_key"))
-                models = wrapper.list_available_models()
-                
-                if filter_type in ["free", "premium", "legacy"]:
-                    console.print(f"\n[bold blue]{filter_type.title()} Models:[/bold blue]")
-                    model_info.display_model_table(models, filter_type)
-                else:
-                    console.print("[yellow]Unknown filter. Use: !models free, !models premium, !models legacy, or !models refresh[/yellow]")
-            except Exception as e:
-                console.print(f"[red]Error fetching models: {e}[/red]")
-        else:
-            display_models()
-    elif cmd.startswith("!model "):
-        parts = cmd.split(" ", 1)
-        if len(parts) > 1:
-            new_model = parts[1].strip()
-            
-            # Check if switching to a premium model and show detailed warning
-            if model_info.is_premium_model(new_model):
-                if not model_info.show_premium_warning(new_model):
-                    console.print("[yellow]Model switch cancelled.[/yellow]")
-                    return current_model
-            
-            # Show model information
-            model_info.show_model_info(new_model)
-            console.print(f"\n[green]✓ Switched to model: {new_model}[/green]")
-            return new_model
-        else:
-            console.print("[yellow]Please specify a model name. Example: !model gemini-2.5-flash[/yellow]")
-            console.print("[yellow]Use !models to see available models.[/yellow]")
-    elif cmd == "!forget-sudo":
-        reset_sudo_password()
-        console.print("[green]Sudo password reset successfully.[/green]")
-    elif cmd == "!docs":
-        console.print("[bold blue]Documentation:[/bold blue] https://lusan-sapkota.github.io/smart-shell/")
-    elif cmd == "!update":
-        handle_update_command()
-    elif cmd == "!creator":
-        show_creator_info()
-    elif cmd == "!last":
-        show_last_command()
-    elif cmd == "!redo":
-        redo_last_command()
-    elif cmd == "!errors":
-        show_error_log()
-    elif cmd == "!web":
-        toggle_web_search()
-    else:
-        console.print(f"[yellow]Unknown special command: {command}[/yellow]")
+    # Commands without arguments are looked up in the dispatch table
+    handler = _SPECIAL_COMMANDS.get(cmd)
+    if handler:
+        handler()
+        return current_model
+    
+    # Otherwise split off the argument once and dispatch on the command word
+    name, _, argument = cmd.partition(" ")
+    handler = _SPECIAL_COMMANDS_WITH_ARG.get(name)
+    if handler:
+        return handler(argument.strip(), current_model)
     
+    console.print(f"[yellow]Unknown special command: {command}[/yellow]")
     return current_model
 
+def show_filtered_models(filter_type):
+    """Handle `!models <filter>` by showing only free, premium or legacy models."""
+    from .ai_wrapper import get_wrapper
+    from .model_info import model_info
+
+    if filter_type == "refresh":
+        refresh_models()
+        return
+    
+    try:
+        api_key = os.environ.get(ENV_API_KEY) or load_config().get("api_key")
+        wrapper = get_wrapper(api_key)
+        models = _get_models_cached(wrapper, api_key)
+        
+        if filter_type in ["free", "premium", "legacy"]:
+            console.print(f"\n[bold blue]{filter_type.title()} Models:[/bold blue]")
+            model_info.display_model_table(models, filter_type)
+        else:
+            console.print("[yellow]Unknown filter. Use: !models free, !models premium, !models legacy, or !models refresh[/yellow]")
+    except Exception as e:
+        console.print(f"[red]Error fetching models: {e}[/red]")
+
+def switch_model(new_model, current_model):
+    """Handle `!model <name>`, returning the model to use from now on."""
+    from .model_info import model_info
+
+    if not new_model:
+        console.print("[yellow]Please specify a model name. Example: !model gemini-2.5-flash[/yellow]")
+        console.print("[yellow]Use !models to see available models.[/yellow]")
+        return current_model
+    
+    # Check if switching to a premium model and show detailed warning
+    if model_info.is_premium_model(new_model):
+        if not model_info.show_premium_warning(new_model):
+            console.print("[yellow]Model switch cancelled.[/yellow]")
+            return current_model
+    
+    # Show model information
+    model_info.show_model_info(new_model)
+    console.print(f"\n[green]✓ Switched to model: {new_model}[/green]")
+    return new_model
+
+def refresh_models():
+    """Refresh model information from web sources and show the models."""
+    from .model_info import model_info
+
+    console.print("[blue]Refreshing model information from web sources...[/blue]")
+    _models_cache.clear()
+    model_info.refresh_model_info()
+    display_models(force_refresh=True)
+
+def clear_screen():
+    """Clear the terminal and redraw the banner."""
+    from .shell_builder import display_banner
+
+    # ANSI clear-screen sequence via rich; no clear/cls subprocess
+    console.clear()
+    display_banner()
+
+def clear_plan_cache():
+    """Handle `!cache clear` by dropping every cached command plan."""
+    from . import cmd_cache
+
+    removed = cmd_cache.clear()
+    console.print(f"[green]Cleared {removed} cached plan(s).[/green]")
+
+def forget_sudo_password():
+    """Forget the sudo password stored for this session."""
+    reset_sudo_password()
+    console.print("[green]Sudo password reset successfully.[/green]")
+
+def show_docs_link():
+    """Show the link to the online documentation."""
+    console.print("[bold blue]Documentation:[/bold blue] https://lusan-sapkota.github.io/smart-shell/")
+
 def show_help():
     """Show help information in interactive mode."""
+    from rich.markdown import Markdown
+
     shell_type = detect_shell()
     help_text = f"""
 # Smart-Shell Help
@@ -425,9 +630,10 @@ Examples:
 - `!last` - Show the last generated command
 - `!redo` - Re-execute the last command
 - `!web` - Toggle web search for commands
-- `!update` - Check for updates and install
+- `!update` - Check for updates and install (`!update --force` skips the cached version check)
 - `!errors` - Show the error log
 - `!forget-sudo` - Clear the session sudo password
+- `!cache clear` - Forget cached plans so every prompt is sent to the AI again
 - `!creator` - Show information about the creator
 - `!docs` - Show link to documentation
 
@@ -454,6 +660,58 @@ For more, see the documentation or run `smart-shell --help`.
     md = Markdown(help_text)
     console.print(Panel(md, title="Smart-Shell Help", border_style="blue"))
 
+@contextmanager
+def _history_lock():
+    """Hold an exclusive lock on the history files; a no-op where fcntl is unavailable."""
+    if fcntl is None:
+        yield
+        return
+    with open(HISTORY_LOCK_FILE, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+def _migrate_legacy_history():
+    """Move entries from the legacy history.json into the JSONL history, once per process."""
+    global _history_migrated
+    if _history_migrated:
+        return
+    _history_migrated = True
+    
+    if not os.path.exists(LEGACY_HISTORY_FILE):
+        return
+    
+    try:
+        os.makedirs(HISTORY_DIR, exist_ok=True)
+        # Read under the lock so two sessions never migrate the same file
+        with _history_lock():
+            _merge_legacy_history()
+    except (OSError, jsonlib.JSONDecodeError) as e:
+        log_error(f"Could not migrate {LEGACY_HISTORY_FILE}: {e}")
+
+def _merge_legacy_history():
+    """Rewrite the JSONL history with the legacy entries first; call with the history lock held."""
+    try:
+        with open(LEGACY_HISTORY_FILE, "rb") as f:
+            legacy = jsonlib.loads(f.read())
+    except FileNotFoundError:
+        # Another session migrated it while we waited for the lock
+        return
+    
+    # Entries saved since the upgrade are newer, so they go after the legacy ones
+    try:
+        with open(HISTORY_FILE, "rb") as f:
+            existing = f.read()
+    except FileNotFoundError:
+        existing = b""
+    migrated = b""
+    if isinstance(legacy, list):
+        migrated = b"".join(jsonlib.dumps_bytes(entry) + b"\n" for entry in legacy if isinstance(entry, dict))
+    write_atomic(HISTORY_FILE, migrated + existing)
+    os.replace(LEGACY_HISTORY_FILE, LEGACY_HISTORY_FILE + ".bak")
+
 def save_to_history(prompt, command, executed=False):
     """
     Save a command to history.
@@ -467,9 +725,11 @@ def save_to_history(prompt, command, executed=False):
         str: The ID of the history entry
     """
     os.makedirs(HISTORY_DIR, exist_ok=True)
+    _migrate_legacy_history()
     
-    # Generate a unique ID
-    history_id = datetime.now().strftime("%Y%m%d%H%M%S")
+    # Generate a unique ID; a per-second timestamp collides when two
+    # commands run within the same second
+    history_id = f"{time.time_ns()}-{next(_history_counter)}"
     
     # Create history entry
     entry = {
@@ -481,21 +741,10 @@ def save_to_history(prompt, command, executed=False):
         "success": None  # Will be updated after execution
     }
     
-    # Load existing history
-    history = []
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                history = json.load(f)
-        except:
-            history = []
-    
-    # Add new entry
-    history.append(entry)
-    
-    # Save history
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+    # Append the new entry as compact JSON bytes; the lock keeps concurrent
+    # sessions from interleaving records
+    with _history_lock(), open(HISTORY_FILE, "ab", buffering=HISTORY_WRITE_BUFFER) as f:
+        f.write(jsonlib.dumps_bytes(entry) + b"\n")
     
     return history_id
 
@@ -503,44 +752,156 @@ def update_history_result(history_id, success):
     """
     Update the success status of a history entry.
     
+    The result is appended to the status file rather than rewriting the
+    history entry in place; it is merged back in by `load_history`.
+    
     Args:
         history_id (str): The ID of the history entry
         success (bool): Whether the command executed successfully
     """
-    if not os.path.exists(HISTORY_FILE):
-        return
+    os.makedirs(HISTORY_DIR, exist_ok=True)
+    with _history_lock(), open(HISTORY_STATUS_FILE, "ab", buffering=HISTORY_WRITE_BUFFER) as f:
+        f.write(jsonlib.dumps_bytes({"id": history_id, "success": success}) + b"\n")
+
+def _read_jsonl(path, limit=None):
+    """
+    Read a JSONL file into a list of objects, skipping unreadable lines.
+    
+    Args:
+        path (str): The file to read
+        limit (int, optional): Only return the last `limit` readable objects
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    def parse(f):
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield jsonlib.loads(line)
+            except jsonlib.JSONDecodeError:
+                continue
+
+    with open(path, "rb") as f:
+        # Skip bad lines before the limit applies, so a broken tail does not
+        # hide older entries; the bounded deque keeps only the last records
+        return list(deque(parse(f), maxlen=limit or None))
+
+def _read_jsonl_tail(path, count):
+    """
+    Read the last `count` lines of a JSONL file, skipping unreadable lines.
+    
+    The file is read backwards in HISTORY_TAIL_BLOCK blocks, so only its
+    tail is read and parsed.
+    
+    Returns:
+        tuple: (records, whether the whole file was read)
+    
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    with open(path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        data = b""
+        while pos > 0 and data.count(b"\n") <= count:
+            step = min(HISTORY_TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.splitlines()
+    if pos > 0:
+        # The first line may start before the block that was read
+        lines = lines[1:]
+    records = []
+    for line in lines[-count:]:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            records.append(jsonlib.loads(line))
+        except jsonlib.JSONDecodeError:
+            continue
+    return records, pos == 0 and len(lines) <= count
+
+def _load_history_results(wanted, limit=None):
+    """
+    Map the wanted history IDs to their latest recorded result.
+    
+    Args:
+        wanted (set): IDs of the entries to look up
+        limit (int, optional): Number of entries loaded, used to size the tail read
+    
+    Returns:
+        dict: ID -> success, for the IDs that have a result
+    """
+    def collect(statuses):
+        return {status.get("id"): status.get("success") for status in statuses if status.get("id") in wanted}
+
+    try:
+        if limit:
+            statuses, complete = _read_jsonl_tail(HISTORY_STATUS_FILE, limit * HISTORY_STATUS_MARGIN)
+            results = collect(statuses)
+            if complete or wanted <= results.keys():
+                return results
+        # A result is older than the tail, or missing altogether
+        return collect(_read_jsonl(HISTORY_STATUS_FILE))
+    except FileNotFoundError:
+        return {}
+
+def load_history(limit=None):
+    """
+    Load the command history with execution results merged in.
     
-    # Load history
-    with open(HISTORY_FILE, "r") as f:
-        history = json.load(f)
+    Args:
+        limit (int, optional): Only load the most recent `limit` entries
     
-    # Update entry
-    for entry in history:
-        if entry["id"] == history_id:
-            entry["success"] = success
-            break
+    Returns:
+        list: History entries, oldest first
     
-    # Save history
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=2)
+    Raises:
+        FileNotFoundError: If no history has been saved yet
+    """
+    _migrate_legacy_history()
+    history = _read_jsonl(HISTORY_FILE, limit)
+    # Only executed commands get a result, and entries migrated from the
+    # legacy file already carry theirs
+    wanted = {entry.get("id") for entry in history if entry.get("executed") and entry.get("success") is None}
+    if wanted:
+        results = _load_history_results(wanted, limit)
+        for entry in history:
+            if entry.get("id") in results:
+                entry["success"] = results[entry["id"]]
+    return history
 
 def show_command_history():
     """Show the command history."""
-    if not os.path.exists(HISTORY_FILE):
+    from rich.markup import escape
+    from rich.table import Table
+
+    # Load only the entries that are displayed
+    try:
+        history = load_history(limit=10)
+    except FileNotFoundError:
         console.print("[yellow]No command history found.[/yellow]")
         return
     
-    # Load history
-    with open(HISTORY_FILE, "r") as f:
-        history = json.load(f)
-    
     if not history:
         console.print("[yellow]Command history is empty.[/yellow]")
         return
     
-    # Display history
-    console.print("[bold]Command History:[/bold]")
-    for i, entry in enumerate(reversed(history[-10:])):  # Show last 10 entries
+    # Build the whole history as one table so it is rendered in a single pass
+    table = Table(title="[bold]Command History[/bold]", show_header=True, header_style="bold magenta")
+    table.add_column("#", style="dim", width=3)
+    table.add_column("Status", justify="center")
+    table.add_column("Time", style="blue", no_wrap=True)
+    table.add_column("Prompt")
+    # Commands are styled as a whole: lexing each one with Syntax cost more
+    # than rendering the rest of the table
+    table.add_column("Command", style="cyan")
+    
+    for i, entry in enumerate(reversed(history)):
         timestamp = datetime.fromisoformat(entry["timestamp"]).strftime("%Y-%m-%d %H:%M:%S")
         status = ""
         if entry["executed"]:
@@ -551,22 +912,27 @@ def show_command_history():
             else:
                 status = "[yellow]?[/yellow]"
         
-        console.print(f"{i+1}. {status} [blue]{timestamp}[/blue]")
-        console.print(f"   Prompt: {entry['prompt']}")
-        syntax = Syntax(entry["command"], "bash", theme="monokai", line_numbers=False)
-        console.print(f"   Command: {syntax}")
-        console.print("")
+        # Plans are stored as lists of commands, older entries as a single string
+        command = entry["command"]
+        if isinstance(command, list):
+            command = "\n".join(command)
+        
+        table.add_row(str(i + 1), status, timestamp, escape(entry["prompt"]), escape(command))
+    
+    console.print(table)
 
 @cli.command()
 def setup():
     """Setup API key and configuration."""
-    display_banner()
+    from .setup_logic import setup_config
+
+    show_banner()
     setup_config()
 
 @cli.command()
 def version():
     """Show version information."""
-    display_banner()
+    show_banner()
     console.print("[bold]Smart-Shell v1.0.0[/bold]")
     console.print("An intelligent terminal assistant for Bash or Zsh commands")
     console.print("Powered by Google Gemini")
@@ -579,7 +945,7 @@ def cli_help():
 @click.command('version')
 def cli_version():
     """Show version information."""
-    display_banner()
+    show_banner()
     console.print("[bold]Smart-Shell v1.0.0[/bold]")
     console.print("An intelligent terminal assistant for Bash or Zsh commands")
     console.print("Powered by Google Gemini")
@@ -590,7 +956,7 @@ cli.add_command(cli_version)
 @cli.command()
 def history():
     """Show command history."""
-    display_banner()
+    show_banner()
     show_command_history()
 
 @cli.command()
@@ -609,11 +975,13 @@ def main():
         console.print(f"[bold red]Error:[/bold red] {str(e)}")
         sys.exit(1)
 
-if __name__ == "__main__":
-    main()
-
-def handle_update_command():
-    """Handle the !update command to check for and install updates."""
+def handle_update_command(force=False):
+    """
+    Handle the !update command to check for and install updates.
+    
+    Args:
+        force (bool): Ask GitHub for the latest version even if a recent answer is cached
+    """
     try:
         console.print("[blue]🔍 Checking for Smart-Shell updates...[/blue]")
         
@@ -622,7 +990,7 @@ def handle_update_command():
         console.print(f"[blue]📦 Current version: {current_version}[/blue]")
         
         # Get latest version from GitHub
-        latest_version = get_latest_github_version()
+        latest_version = get_latest_github_version(force_refresh=force)
         if not latest_version:
             console.print("[yellow]⚠️  Could not fetch latest version from GitHub.[/yellow]")
             console.print("[dim]Fallback: Try manual update with 'git pull' if in development mode.[/dim]")
@@ -667,6 +1035,19 @@ def handle_update_command():
         console.print(f"[red]❌ Error during update: {e}[/red]")
         log_error(f"Update error: {e}")
 
+def _load_toml(data):
+    """Parse TOML bytes with tomllib (Python 3.11+), falling back to tomli or toml."""
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            import toml
+            return toml.loads(data.decode("utf-8"))
+    return tomllib.loads(data.decode("utf-8"))
+
+@lru_cache(maxsize=1)
 def get_current_version():
     """Get the current version from pyproject.toml or package metadata."""
     try:
@@ -675,47 +1056,128 @@ def get_current_version():
         if project_root:
             pyproject_file = project_root / "pyproject.toml"
             if pyproject_file.exists():
-                with open(pyproject_file, 'r') as f:
-                    pyproject_data = toml.load(f)
+                with open(pyproject_file, 'rb') as f:
+                    pyproject_data = _load_toml(f.read())
                     return pyproject_data.get('project', {}).get('version', 'unknown')
         
-        # Fallback: try to get from installed package
-        import subprocess
-        result = subprocess.run(["pip", "show", "smart-shell"], capture_output=True, text=True)
-        if result.returncode == 0:
-            for line in result.stdout.split('\n'):
-                if line.startswith('Version:'):
-                    return line.split(':')[1].strip()
-        
-        return "unknown"
+        # Fallback: read the installed package's metadata (no pip subprocess)
+        from importlib.metadata import version as package_version
+        return package_version("smart-shell")
     except Exception:
         return "unknown"
 
-def get_latest_github_version():
-    """Get the latest version from GitHub releases."""
+def force_update_command():
+    """Handle `!update --force`, bypassing the cached latest version."""
+    handle_update_command(force=True)
+
+def get_latest_github_version(force_refresh=False):
+    """
+    Get the latest version from GitHub releases.
+    
+    The answer is cached on disk for UPDATE_CACHE_TTL seconds. After that
+    it is revalidated with its ETag, and reused if GitHub reports it
+    unchanged or the API rate limit is exhausted.
+    
+    Args:
+        force_refresh (bool): Revalidate with GitHub even if the cache is fresh
+    
+    Returns:
+        str or None: The latest version, or None if it could not be fetched
+    """
     try:
+        with open(UPDATE_CACHE_FILE, "rb") as f:
+            cached = jsonlib.loads(f.read())
+        if not isinstance(cached, dict):
+            cached = {}
+    except (OSError, jsonlib.JSONDecodeError):
+        cached = {}
+    
+    cached_version = cached.get("version")
+    ts = cached.get("ts")
+    fresh = isinstance(ts, (int, float)) and time.time() - ts < UPDATE_CACHE_TTL
+    if not force_refresh and cached_version and fresh:
+        return cached_version
+    
+    version, etag = _fetch_latest_github_version(cached.get("etag") if cached_version else None)
+    if version is _USE_CACHED:
+        version, etag = cached_version, cached.get("etag")
+    if version:
+        try:
+            os.makedirs(os.path.dirname(UPDATE_CACHE_FILE), exist_ok=True)
+            write_atomic(UPDATE_CACHE_FILE, jsonlib.dumps_bytes({"ts": time.time(), "version": version, "etag": etag}))
+        except OSError:
+            pass
+    return version
+
+@lru_cache(maxsize=None)
+def _http_session():
+    """Create (once per process) the HTTP session used for update checks, so connections are reused."""
+    import requests
+
+    session = requests.Session()
+    session.headers["User-Agent"] = "smart-shell"
+    return session
+
+# Returned by _fetch_latest_github_version when the cached version is still good
+_USE_CACHED = object()
+
+def _fetch_latest_github_version(etag=None):
+    """
+    Ask GitHub for the latest released version.
+    
+    Args:
+        etag (str, optional): ETag of the cached release, sent as If-None-Match
+    
+    Returns:
+        tuple: (version, etag), where version is None if it could not be
+        fetched, or _USE_CACHED if the release is unchanged (304) or the
+        API rate limit is exhausted
+    """
+    try:
+        session = _http_session()
         url = "https://api.github.com/repos/Lusan-sapkota/smart-shell/releases/latest"
         headers = {"Accept": "application/vnd.github.v3+json"}
+        if etag:
+            # A 304 answer doesn't count against the unauthenticated rate limit
+            headers["If-None-Match"] = etag
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
             release_data = response.json()
-            return release_data.get('tag_name', '').lstrip('v')
+            return release_data.get('tag_name', '').lstrip('v'), response.headers.get("ETag")
+        if response.status_code == 304:
+            return _USE_CACHED, etag
+        if response.status_code in (403, 429) and response.headers.get("X-RateLimit-Remaining") == "0":
+            log_error("GitHub API rate limit exhausted; using the cached latest version")
+            return _USE_CACHED, etag
         
         # Fallback: check pyproject.toml from main branch
         url = "https://raw.githubusercontent.com/Lusan-sapkota/smart-shell/main/pyproject.toml"
-        response = requests.get(url, timeout=10)
+        response = session.get(url, timeout=HTTP_TIMEOUT)
         if response.status_code == 200:
-            pyproject_data = toml.loads(response.text)
-            return pyproject_data.get('project', {}).get('version', None)
+            pyproject_data = _load_toml(response.content)
+            return pyproject_data.get('project', {}).get('version', None), None
         
-        return None
+        return None, None
     except Exception as e:
         log_error(f"Error fetching GitHub version: {e}")
-        return None
+        return None, None
 
 def compare_versions(version1, version2):
     """Compare two version strings. Returns: -1 if v1 < v2, 0 if equal, 1 if v1 > v2."""
+    # packaging (when installed) handles pre-releases and any number of
+    # segments; versions it can't parse, like 'unknown', use the fallback below
+    try:
+        from packaging.version import Version, InvalidVersion
+        try:
+            v1, v2 = Version(version1), Version(version2)
+        except (InvalidVersion, TypeError):
+            pass
+        else:
+            return (v1 > v2) - (v1 < v2)
+    except ImportError:
+        pass
+    
     try:
         def normalize_version(v):
             # Handle 'unknown' or empty versions
@@ -739,6 +1201,7 @@ def compare_versions(version1, version2):
     except Exception:
         return 0  # Assume equal if comparison fails
 
+@lru_cache(maxsize=1)
 def find_project_root():
     """Find the project root directory by looking for pyproject.toml."""
     try:
@@ -754,6 +1217,39 @@ def find_project_root():
     except Exception:
         return None
 
+async def _stream_subprocess(argv):
+    """Run a command, printing its combined output line by line as it arrives."""
+    import asyncio
+
+    process = await asyncio.create_subprocess_exec(
+        *argv, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+    )
+    try:
+        async for line in process.stdout:
+            console.print(line.decode("utf-8", "replace").rstrip(), style="dim", markup=False, highlight=False)
+        return await process.wait()
+    except asyncio.CancelledError:
+        # Ctrl+C: don't leave the command running behind us
+        process.kill()
+        await process.wait()
+        raise
+
+def run_streamed(argv, status):
+    """
+    Run a long command with a spinner, streaming its output to the console.
+    
+    Args:
+        argv (list): The command and its arguments
+        status (str): Message shown next to the spinner
+    
+    Returns:
+        int: The command's exit code
+    """
+    import asyncio
+
+    with console.status(status, spinner="dots"):
+        return asyncio.run(_stream_subprocess(argv))
+
 def update_via_git(project_root):
     """Update using git pull for development environment."""
     try:
@@ -766,19 +1262,15 @@ def update_via_git(project_root):
             subprocess.run(["git", "stash"], capture_output=True)
         
         # Pull latest changes
-        console.print("[blue]📥 Pulling latest changes...[/blue]")
-        result = subprocess.run(["git", "pull", "origin", "main"], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            console.print(f"[red]Git pull failed: {result.stderr}[/red]")
+        returncode = run_streamed(["git", "pull", "origin", "main"], "[blue]📥 Pulling latest changes...[/blue]")
+        if returncode != 0:
+            console.print(f"[red]Git pull failed (exit code {returncode}).[/red]")
             return False
         
         # Reinstall in development mode
-        console.print("[blue]🔧 Reinstalling package...[/blue]")
-        result = subprocess.run([sys.executable, "-m", "pip", "install", "-e", "."], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            console.print(f"[red]Package reinstall failed: {result.stderr}[/red]")
+        returncode = run_streamed([sys.executable, "-m", "pip", "install", "-e", "."], "[blue]🔧 Reinstalling package...[/blue]")
+        if returncode != 0:
+            console.print(f"[red]Package reinstall failed (exit code {returncode}).[/red]")
             return False
         
         return True
@@ -790,14 +1282,12 @@ def update_via_git(project_root):
 def update_via_pip():
     """Update using pip for installed package."""
     try:
-        console.print("[blue]📥 Updating via pip...[/blue]")
-        result = subprocess.run([
-            sys.executable, "-m", "pip", "install", "--upgrade", 
+        returncode = run_streamed([
+            sys.executable, "-m", "pip", "install", "--upgrade",
             "git+https://github.com/Lusan-sapkota/smart-shell.git"
-        ], capture_output=True, text=True)
-        
-        if result.returncode != 0:
-            console.print(f"[red]Pip update failed: {result.stderr}[/red]")
+        ], "[blue]📥 Updating via pip...[/blue]")
+        if returncode != 0:
+            console.print(f"[red]Pip update failed (exit code {returncode}).[/red]")
             return False
         
         return True
@@ -829,13 +1319,10 @@ def show_creator_info():
 
 def show_last_command():
     """Show the last generated command from history."""
-    if not os.path.exists(HISTORY_FILE):
-        console.print("[yellow]No command history found.[/yellow]")
-        return
-    
+    from rich.syntax import Syntax
+
     try:
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
+        history = load_history(limit=1)
         
         if not history:
             console.print("[yellow]Command history is empty.[/yellow]")
@@ -855,18 +1342,15 @@ def show_last_command():
             syntax = Syntax(command, "bash", theme="monokai", line_numbers=False)
             console.print(f"[blue]Command:[/blue] {syntax}")
             
+    except FileNotFoundError:
+        console.print("[yellow]No command history found.[/yellow]")
     except Exception as e:
         console.print(f"[red]Error reading command history: {e}[/red]")
 
 def redo_last_command():
     """Re-execute the last command from history."""
-    if not os.path.exists(HISTORY_FILE):
-        console.print("[yellow]No command history found.[/yellow]")
-        return
-    
     try:
-        with open(HISTORY_FILE, "r") as f:
-            history = json.load(f)
+        history = load_history(limit=1)
         
         if not history:
             console.print("[yellow]Command history is empty.[/yellow]")
@@ -896,15 +1380,13 @@ def redo_last_command():
             else:
                 console.print("[red]✗ Command execution failed.[/red]")
         
+    except FileNotFoundError:
+        console.print("[yellow]No command history found.[/yellow]")
     except Exception as e:
         console.print(f"[red]Error re-executing command: {e}[/red]")
 
 def show_error_log():
     """Show the error log."""
-    if not os.path.exists(ERROR_LOG_FILE):
-        console.print("[green]No errors logged yet! 🎉[/green]")
-        return
-    
     try:
         with open(ERROR_LOG_FILE, "r") as f:
             logs = f.read().strip()
@@ -925,6 +1407,8 @@ def show_error_log():
         if len(lines) > 10:
             console.print(f"\n[dim]... and {len(lines) - 10} more entries in {ERROR_LOG_FILE}[/dim]")
             
+    except FileNotFoundError:
+        console.print("[green]No errors logged yet! 🎉[/green]")
     except Exception as e:
         console.print(f"[red]Error reading error log: {e}[/red]")
 
@@ -943,12 +1427,44 @@ def toggle_web_search():
     console.print("  • Community command examples integration")
     console.print("[dim]Smart-Shell is already a powerful, web-informed tool![/dim]")
 
+# Models that may incur costs, lower-cased for matching
+PREMIUM_MODELS = (
+    "gemini-2.5-pro",
+    "models/gemini-2.5-pro",
+    "gemini-pro",  # Add other premium models as needed
+    "models/gemini-pro",
+)
+
 def is_premium_model(model_name):
     """Check if a model is a premium model that may incur costs."""
-    premium_models = [
-        "gemini-2.5-pro", 
-        "models/gemini-2.5-pro",
-        "gemini-pro",  # Add other premium models as needed
-        "models/gemini-pro"
-    ]
-    return any(premium.lower() in model_name.lower() for premium in premium_models)
\ No newline at end of file
+    model_name = model_name.lower()
+    return any(premium in model_name for premium in PREMIUM_MODELS)
+
+# Special commands that take no arguments, dispatched by handle_special_command
+_SPECIAL_COMMANDS = {
+    "!history": show_command_history,
+    "!clear": clear_screen,
+    "!help": show_help,
+    "!models": display_models,
+    "!models refresh": refresh_models,
+    "!forget-sudo": forget_sudo_password,
+    "!cache clear": clear_plan_cache,
+    "!docs": show_docs_link,
+    "!update": handle_update_command,
+    "!update --force": force_update_command,
+    "!creator": show_creator_info,
+    "!last": show_last_command,
+    "!redo": redo_last_command,
+    "!errors": show_error_log,
+    "!web": toggle_web_search,
+}
+
+# Special commands that take an argument, called as handler(argument, current_model)
+# and returning the model to use from then on
+_SPECIAL_COMMANDS_WITH_ARG = {
+    "!models": lambda argument, current_model: show_filtered_models(argument) or current_model,
+    "!model": switch_model,
+}
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,9 @@ Safety Module for Smart-Shell - Classifies commands into risk levels.
 """
 
 import re
-from typing import Dict, Any
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, Iterable, List, Mapping, Optional
 
 # ==============================================================================
 # Risk Level Definitions
@@ -90,57 +92,133 @@ INFO_LEAK_PATTERNS = {
 # but we have a separate check for them to handle password logic.
 SUDO_PATTERN = r"\bsudo\b"
 
-def check_command_safety(command: str) -> Dict[str, Any]:
+# Shared results for commands that match no rule. They are read-only, so
+# every caller can be handed the same object.
+SAFE_RESULT = MappingProxyType({
+    "status": "safe",
+    "reason": "No high or medium risk patterns were detected.",
+    "notes": "Command appears to be safe for execution."
+})
+EMPTY_RESULT = MappingProxyType({
+    "status": "safe",
+    "reason": "Command is empty.",
+    "notes": "Nothing will be executed."
+})
+
+# ==============================================================================
+# Compiled Patterns
+# ==============================================================================
+# Patterns are compiled on first use rather than at import time, so importing
+# the package (e.g. for `smart-shell --help`) doesn't pay for it.
+
+# Flags for every safety regex. Not re.ASCII: \s must also match Unicode
+# spaces such as NBSP, or 'rm \u00a0 -rf ~/' would pass as safe
+_FLAGS = re.IGNORECASE
+
+_TIERS = {
+    "high": HIGH_RISK_PATTERNS,
+    "sudo": {SUDO_PATTERN: "Executing commands with root privileges can have significant system-wide effects."},
+    "medium": MEDIUM_RISK_PATTERNS,
+    "info_leak": INFO_LEAK_PATTERNS,
+}
+
+# Tiers in the order they are checked: (tier, resulting status, reason).
+# Sudo usage automatically elevates risk to MEDIUM, ahead of the medium rules.
+_TIER_CHECKS = (
+    ("high", "high", "High-risk pattern matched: '{pattern}'."),
+    ("sudo", "medium", "Command uses 'sudo'."),
+    ("medium", "medium", "Medium-risk pattern matched: '{pattern}'."),
+    ("info_leak", "info_leak", "Info-leak pattern matched: '{pattern}'."),
+)
+
+@lru_cache(maxsize=None)
+def _compile_tier(tier: str):
+    """
+    Compile a tier's pattern table into a single alternation.
+    
+    Each pattern becomes a named group, so one scan of the command finds a
+    match for the whole table and `match.lastgroup` tells which rule fired.
+    
+    Returns:
+        A (compiled, rules) pair, where rules maps group names to
+        (pattern, reason) tuples.
+    """
+    rules = {f"p{i}": (pattern, reason) for i, (pattern, reason) in enumerate(_TIERS[tier].items())}
+    combined = "|".join(f"(?P<{name}>{pattern})" for name, (pattern, _) in rules.items())
+    return re.compile(combined, _FLAGS), rules
+
+@lru_cache(maxsize=None)
+def _compile_any():
+    """Compile every rule, including sudo, into one alternation used to pre-screen commands."""
+    patterns = [pattern for table in _TIERS.values() for pattern in table]
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), _FLAGS)
+
+def _check_tiers(command: str) -> Optional[Mapping[str, Any]]:
+    """
+    Find the highest-risk rule matching a command.
+    
+    Args:
+        command (str): The command to check.
+        
+    Returns:
+        The safety result of the first matching tier, or None if no rule matches.
+    """
+    for tier, status, reason in _TIER_CHECKS:
+        regex, rules = _compile_tier(tier)
+        match = regex.search(command)
+        if match:
+            pattern, notes = rules[match.lastgroup]
+            return MappingProxyType({
+                "status": status,
+                "reason": reason.format(pattern=pattern),
+                "notes": notes
+            })
+
+    return None
+
+@lru_cache(maxsize=1024)
+def check_command_safety(command: str) -> Mapping[str, Any]:
     """
     Check the safety level of a command based on predefined patterns.
     
+    Results are cached per command string and shared between callers, so
+    they are returned as read-only mappings.
+    
     Args:
         command (str): The command to check.
         
     Returns:
-        A dictionary containing the safety status ('high', 'medium', 'safe')
-        and a reason for the classification.
+        A read-only mapping containing the safety status ('high', 'medium',
+        'info_leak', 'safe') and a reason for the classification.
     """
-    # 1. Check for HIGH risk commands
-    for pattern, reason in HIGH_RISK_PATTERNS.items():
-        if re.search(pattern, command, re.IGNORECASE):
-            return {
-                "status": "high",
-                "reason": f"High-risk pattern matched: '{pattern}'.",
-                "notes": reason
-            }
-
-    # 2. Check for SUDO usage, which automatically elevates risk to MEDIUM
-    if re.search(SUDO_PATTERN, command, re.IGNORECASE):
-        return {
-            "status": "medium",
-            "reason": "Command uses 'sudo'.",
-            "notes": "Executing commands with root privileges can have significant system-wide effects."
-        }
+    # Blank commands can't match any rule, so skip the regex scans
+    if not command or command.isspace():
+        return EMPTY_RESULT
+
+    # Most commands are benign; one scan over every rule clears them before
+    # the tiers are checked in priority order
+    if _compile_any().search(command):
+        result = _check_tiers(command)
+        if result is not None:
+            return result
+
+    # If no specific risk pattern is matched, consider it safe
+    return SAFE_RESULT
 
-    # 3. Check for MEDIUM risk commands
-    for pattern, reason in MEDIUM_RISK_PATTERNS.items():
-        if re.search(pattern, command, re.IGNORECASE):
-            return {
-                "status": "medium",
-                "reason": f"Medium-risk pattern matched: '{pattern}'.",
-                "notes": reason
-            }
-    # 3. Check for INFO LEAK commands
-    for pattern, reason in INFO_LEAK_PATTERNS.items():
-        if re.search(pattern, command, re.IGNORECASE):
-            return {
-                "status": "info_leak",
-                "reason": f"Info-leak pattern matched: '{pattern}'.",
-                "notes": reason
-            }
-            
-    # 4. If no specific risk pattern is matched, consider it safe
-    return {
-        "status": "safe",
-        "reason": "No high or medium risk patterns were detected.",
-        "notes": "Command appears to be safe for execution."
-    }
+def check_command_safety_batch(commands: Iterable[str]) -> List[Mapping[str, Any]]:
+    """
+    Check the safety level of several commands, e.g. every step of a plan.
+    
+    Each distinct command is scanned once; repeats are served from the
+    check_command_safety cache.
+    
+    Args:
+        commands (Iterable[str]): The commands to check.
+        
+    Returns:
+        A list of read-only mappings in the same order as `commands`.
+    """
+    return list(map(check_command_safety, commands))
 
 # Main block for testing the safety checker
 if __name__ == "__main__":
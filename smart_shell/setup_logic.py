@@ -3,15 +3,14 @@ Setup Logic Module - Handles all interactive setup for Smart-Shell.
 """
 
 import os
-import base64
 from rich.console import Console
 from rich.prompt import Prompt, Confirm
 from rich.panel import Panel
 
 # Import necessary functions from other modules
-from .ai_wrapper import validate_api_key, get_wrapper
+from .ai_wrapper import validate_api_key, looks_like_api_key, get_wrapper
 from .utils import validate_sudo_password, log_error
-from .config import load_config, save_config
+from .config import load_config, save_config, store_sudo_password, clear_sudo_password
 from .model_info import model_info
 
 console = Console()
@@ -34,12 +33,15 @@ def setup_config():
         
     setup_sudo_password(config)
     
-    api_key = os.environ.get(ENV_API_KEY) or config.get("api_key")
+    env_key = os.environ.get(ENV_API_KEY)
+    api_key = env_key or config.get("api_key")
     if api_key:
         set_default_model(api_key, config)
 
     save_config(config)
-    console.print(f"\n[bold]Reminder:[/bold] You can also set your API key via the {ENV_API_KEY} environment variable.")
+    # Only point at the environment variable if it isn't already in use
+    if not env_key:
+        console.print(f"\n[bold]Reminder:[/bold] You can also set your API key via the {ENV_API_KEY} environment variable.")
     console.print("\n[green]Setup complete![/green]")
 
 def setup_api_key(config):
@@ -52,6 +54,7 @@ def setup_api_key(config):
     console.print("\n[bold]API Key Configuration[/bold]")
     
     if current_key:
+        # Fixed-width mask: only the last four characters are ever shown
         masked_key = f"****{current_key[-4:]}"
         console.print(f"An API key is already configured ({masked_key}).")
         if not Confirm.ask("Do you want to change it?", choices=["y", "n"], default="n"):
@@ -66,10 +69,10 @@ def setup_api_key(config):
         if Confirm.ask("Do you want to see the API key you entered for verification?", choices=["y", "n"], default="n"):
             console.print(f"[dim]API key entered: {api_key}[/dim]")
         
-        # Basic format check before validation
-        if not api_key.startswith('AIza') or len(api_key) < 35:
+        # Basic format check before validation; unusual keys may still be valid
+        if not looks_like_api_key(api_key):
             console.print("[yellow]⚠️  Warning: This doesn't look like a typical Gemini API key format.[/yellow]")
-            console.print("   Gemini API keys usually start with 'AIza' and are ~39 characters long.")
+            console.print("   Gemini API keys usually start with 'AIza' and are 39 characters long.")
             if not Confirm.ask("Do you want to continue with validation anyway?", choices=["y", "n"], default="y"):
                 continue
         
@@ -84,7 +87,7 @@ def setup_api_key(config):
             console.print(f"[bold red]✗ Validation failed: {message}[/bold red]")
             
             # Provide helpful guidance for common API key issues
-            if "API key not valid" in message or "INVALID_ARGUMENT" in message:
+            if "API key not valid" in message or "INVALID_ARGUMENT" in message or message.startswith("Invalid API key"):
                 console.print("[yellow]💡 API Key Help:[/yellow]")
                 console.print("   • Make sure you're using a [bold]Gemini API key[/bold] (not other Google APIs)")
                 console.print("   • Get your key from: [blue]https://makersuite.google.com/app/apikey[/blue]")
@@ -97,10 +100,10 @@ def setup_api_key(config):
 def setup_sudo_password(config):
     """Handles the sudo password part of the setup."""
     console.print("\n[bold]Sudo Password Configuration (Optional)[/bold]")
-    has_existing_password = "sudo_password_b64" in config and config["sudo_password_b64"]
+    has_existing_password = config.get("sudo_password_b64") or config.get("sudo_password_keyring")
 
     warning_panel = Panel(
-        "[bold yellow]Warning:[/bold yellow] Storing your sudo password allows Smart-Shell to run commands with root privileges without asking. It's stored encoded, not encrypted.",
+        "[bold yellow]Warning:[/bold yellow] Storing your sudo password allows Smart-Shell to run commands with root privileges without asking. It's kept in the system keyring if the keyring package is installed, otherwise stored encoded, not encrypted.",
         title="[red]Security Warning[/red]", border_style="red"
     )
     console.print(warning_panel)
@@ -113,14 +116,13 @@ def setup_sudo_password(config):
     while True:
         password = Prompt.ask("Enter your new sudo password (leave blank to remove)", password=True)
         if not password:
-            if "sudo_password_b64" in config: del config["sudo_password_b64"]
+            clear_sudo_password(config)
             console.print("[green]Sudo password has been removed.[/green]")
             break
         
         console.print("[blue]Validating sudo password...[/blue]")
         if validate_sudo_password(password):
-            encoded_pass = base64.b64encode(password.encode('utf-8')).decode('utf-8')
-            config["sudo_password_b64"] = encoded_pass
+            store_sudo_password(config, password)
             console.print("[green]✓ Sudo password validated and saved.[/green]")
             break
         else:
@@ -4,9 +4,9 @@ Shell Builder Module - Generates shell commands from natural language prompts.
 
 import os
 import sys
-import time
 import re
 import json
+from functools import lru_cache
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
@@ -34,46 +34,21 @@ BANNER = r"""
   Natural Language → Bash/Zsh Commands
 """
 
-# Maximum number of retries for command generation
-MAX_RETRIES = 3
-# Delay between retries (in seconds)
-RETRY_DELAY = 2
-
-def generate_command_plan(prompt, api_key, model=None, os_info=None, shell_type=None, max_retries=MAX_RETRIES):
-    """
-    Generates a sequence of shell commands (a plan) from a natural language prompt.
-
-    Args:
-        prompt (str): Natural language prompt.
-        api_key (str): API key for Gemini.
-        model (str, optional): Model to use. Defaults to None.
-        os_info (dict, optional): Information about the user's OS.
-        shell_type (str, optional): The user's shell ("bash" or "zsh").
-        max_retries (int, optional): Maximum number of retries. Defaults to MAX_RETRIES.
-
-    Returns:
-        list[str]: A list of shell commands.
-    """
-    if os_info is None:
-        os_info = {"name": "a generic Linux system", "id": "linux"}
+# Model used when none is configured or passed in
+DEFAULT_MODEL = "models/gemini-2.5-flash"
 
-    # Detect shell type (bash or zsh) from os_info or environment
-    shell_type = os_info.get('shell', None)
-    if not shell_type:
-        shell_type = os.environ.get('SHELL', '/bin/bash')
-        if 'zsh' in shell_type:
-            shell_type = 'zsh'
-        else:
-            shell_type = 'bash'
+# Maximum number of retries when the AI's answer is not valid JSON
+MAX_RETRIES = 3
 
-    # Enhanced system prompt for maximum intelligence and capability
-    system_prompt = f"""
+# Enhanced system prompt for maximum intelligence and capability. Filled in
+# by build_system_prompt; literal braces are doubled for str.format.
+SYSTEM_PROMPT_TEMPLATE = """
     You are Smart-Shell, an advanced Linux/Unix command-line intelligence system. You are NOT just a wrapper - you are a sophisticated tool that understands context, solves complex problems, and generates robust automation solutions.
 
     SYSTEM CONTEXT:
-    - OS: {os_info.get('name', 'Linux system')} ({os_info.get('id', 'linux')})
+    - OS: {os_name} ({os_id})
     - Shell: {shell_type}
-    - Package Manager: {'apt' if 'ubuntu' in os_info.get('id', '').lower() or 'debian' in os_info.get('id', '').lower() else 'auto-detect'}
+    - Package Manager: {package_manager}
 
     CORE INTELLIGENCE PRINCIPLES:
     1. MAXIMUM HELPFULNESS - Be resourceful, creative, and solution-oriented
@@ -120,19 +95,84 @@ def generate_command_plan(prompt, api_key, model=None, os_info=None, shell_type=
     Response: {{"commands": ["python3 -m venv venv", "source venv/bin/activate", "pip install --upgrade pip", "pip install black flake8 pytest", "echo 'venv/' >> .gitignore", "echo 'Development environment ready! Activate with: source venv/bin/activate'"]}}
     """
 
+@lru_cache(maxsize=8)
+def build_system_prompt(os_name, os_id, shell_type):
+    """
+    Render the system prompt for an OS and shell.
+    
+    The result only depends on the environment, so it is rendered once per
+    session and reused for every request.
+    
+    Args:
+        os_name (str): Human-readable OS name.
+        os_id (str): OS identifier, e.g. "ubuntu".
+        shell_type (str): The user's shell ("bash" or "zsh").
+        
+    Returns:
+        str: The system prompt.
+    """
+    os_id_lower = os_id.lower()
+    package_manager = 'apt' if 'ubuntu' in os_id_lower or 'debian' in os_id_lower else 'auto-detect'
+    return SYSTEM_PROMPT_TEMPLATE.format(os_name=os_name, os_id=os_id, shell_type=shell_type, package_manager=package_manager)
+
+def resolve_shell_type(os_info):
+    """
+    Pick the shell plans are generated for.
+    
+    Args:
+        os_info (dict): Information about the user's OS, optionally with a 'shell' entry.
+        
+    Returns:
+        str: The shell from os_info, otherwise "zsh" or "bash" from $SHELL.
+    """
+    # Detect shell type (bash or zsh) from os_info or environment
+    shell_type = os_info.get('shell', None)
+    if not shell_type:
+        shell_type = os.environ.get('SHELL', '/bin/bash')
+        if 'zsh' in shell_type:
+            shell_type = 'zsh'
+        else:
+            shell_type = 'bash'
+    return shell_type
+
+def generate_command_plan(prompt, api_key, model=None, os_info=None, shell_type=None, max_retries=MAX_RETRIES):
+    """
+    Generates a sequence of shell commands (a plan) from a natural language prompt.
+
+    Args:
+        prompt (str): Natural language prompt.
+        api_key (str): API key for Gemini.
+        model (str, optional): Model to use. Defaults to None.
+        os_info (dict, optional): Information about the user's OS.
+        shell_type (str, optional): The user's shell ("bash" or "zsh").
+        max_retries (int, optional): Maximum number of retries. Defaults to MAX_RETRIES.
+
+    Returns:
+        list[str]: A list of shell commands.
+    """
+    if os_info is None:
+        os_info = {"name": "a generic Linux system", "id": "linux"}
+
+    shell_type = resolve_shell_type(os_info)
+    system_prompt = build_system_prompt(os_info.get('name', 'Linux system'), os_info.get('id', 'linux'), shell_type)
+
+    wrapper = get_wrapper(api_key)
+    model_obj = wrapper.get_model(model or DEFAULT_MODEL)
+
     retries = 0
     last_error = "Unknown error occurred"
 
     while retries <= max_retries:
         try:
-            wrapper = get_wrapper(api_key)
-            model_to_use = model if model else "models/gemini-2.5-flash"
-            model_obj = wrapper.get_model(model_to_use)
-
+            # generate_content already retries network and quota errors with
+            # backoff and turns API errors into readable messages. Plans skip
+            # its response cache: cmd_cache already stores the good ones, and
+            # a plan that failed to run or parse must not be replayed
             response = wrapper.generate_content(
                 model_obj,
                 [system_prompt, prompt],
                 retry=True,
+                cache=False,
                 temperature=0.3,  # Optimal balance of creativity and precision
                 top_p=0.95,       # High diversity for comprehensive solutions
                 top_k=60,         # More options for advanced command generation
@@ -165,26 +205,19 @@ def generate_command_plan(prompt, api_key, model=None, os_info=None, shell_type=
             return commands
 
         except json.JSONDecodeError:
-            last_error = "Failed to decode the AI's response as JSON. Retrying..."
+            # A malformed answer is not a temporary failure, so ask again
+            # straight away
+            last_error = "Failed to decode the AI's response as JSON."
             retries += 1
-            time.sleep(RETRY_DELAY)
         except Exception as e:
             last_error = str(e)
-            error_msg = last_error.lower()
-            if "quota" in error_msg or "rate limit" in error_msg or "network" in error_msg or "connection" in error_msg or "timeout" in error_msg or "internet" in error_msg:
-                if retries >= max_retries:
-                    break
-                console.print(f"[yellow]Error: {last_error}[/yellow]")
-                console.print(f"[yellow]Retrying ({retries+1}/{max_retries})...[/yellow]")
-                time.sleep(RETRY_DELAY)
-                retries += 1
-            else:
-                break
+            break
 
     raise Exception(f"Error generating command plan: {last_error}")
 
-def display_banner():
-    """Display the Smart-Shell banner with improved styling."""
+@lru_cache(maxsize=None)
+def _banner_panel():
+    """Build the styled banner panel once; it never changes."""
     # Create a styled version of the banner with gradient colors
     styled_banner = Text()
     lines = BANNER.strip().split('\n')
@@ -208,7 +241,11 @@ def display_banner():
         subtitle_align="center"
     )
     
-    console.print(panel)
+    return panel
+
+def display_banner():
+    """Display the Smart-Shell banner with improved styling."""
+    console.print(_banner_panel())
 
 def create_command_section(title, commands):
     """Create a section of commands for the welcome message."""
@@ -0,0 +1,63 @@
+"""
+Regression tests for the on-disk command plan cache.
+"""
+
+import pytest
+
+from smart_shell import cmd_cache
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Use a fresh cache database for every test."""
+    monkeypatch.setattr(cmd_cache, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(cmd_cache, "CACHE_FILE", str(tmp_path / "commands.db"))
+    monkeypatch.setattr(cmd_cache, "_connection", None)
+    yield tmp_path
+    if cmd_cache._connection is not None:
+        cmd_cache._connection.close()
+
+def _key(prompt="delete Foo.txt", model="models/gemini-2.5-flash", os_id="ubuntu", shell="bash"):
+    return cmd_cache.make_key(prompt, model, os_id, shell)
+
+def test_key_keeps_case():
+    assert _key("delete Foo.txt") != _key("delete foo.txt")
+
+def test_key_normalizes_whitespace():
+    assert _key("delete Foo.txt") == _key("  delete \t Foo.txt\n")
+
+@pytest.mark.parametrize("field", ["model", "os_id", "shell"])
+def test_key_depends_on_environment(field):
+    assert _key() != _key(**{field: "other"})
+
+def test_put_get_delete():
+    key = _key()
+    assert cmd_cache.get(key) is None
+    cmd_cache.put(key, "models/gemini-2.5-flash", ["rm Foo.txt"])
+    assert cmd_cache.get(key) == ["rm Foo.txt"]
+    cmd_cache.delete(key)
+    assert cmd_cache.get(key) is None
+
+def test_expired_plans_are_not_served(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cmd_cache.time, "time", lambda: now[0])
+    cmd_cache.put("old", "m", ["ls"])
+    now[0] += cmd_cache.CACHE_TTL + 1
+    assert cmd_cache.get("old") is None
+    # Expired rows are purged on the next write
+    cmd_cache.put("new", "m", ["pwd"])
+    assert cmd_cache._connect().execute("SELECT hash FROM commands").fetchall() == [("new",)]
+
+def test_size_cap_drops_oldest(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cmd_cache.time, "time", lambda: now[0])
+    monkeypatch.setattr(cmd_cache, "CACHE_MAX_ENTRIES", 3)
+    for i in range(5):
+        now[0] += 1
+        cmd_cache.put(f"k{i}", "m", [f"echo {i}"])
+    assert [cmd_cache.get(f"k{i}") for i in range(5)] == [None, None, ["echo 2"], ["echo 3"], ["echo 4"]]
+
+def test_clear():
+    cmd_cache.put("a", "m", ["ls"])
+    cmd_cache.put("b", "m", ["pwd"])
+    assert cmd_cache.clear() == 2
+    assert cmd_cache.get("a") is None
@@ -0,0 +1,105 @@
+"""
+Regression tests for the cached load_config and the atomic save_config.
+"""
+
+import os
+import stat
+
+import pytest
+
+from smart_shell import config
+
+@pytest.fixture
+def config_home(tmp_path, monkeypatch):
+    """Point the config at an empty home directory and reset the module's caches."""
+    monkeypatch.setenv("HOME", str(tmp_path))
+    config._config_dir.cache_clear()
+    config._config_file.cache_clear()
+    config.clear_config_cache()
+    monkeypatch.setattr(config, "_config_dir_ready", False)
+    yield tmp_path
+    config._config_dir.cache_clear()
+    config._config_file.cache_clear()
+    config.clear_config_cache()
+
+def _mode(path):
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+def test_missing_config_loads_empty(config_home):
+    assert config.load_config() == {}
+
+def test_save_then_load(config_home):
+    config.save_config({"api_key": "k", "default_model": "gemini-x"})
+    assert config.load_config() == {"api_key": "k", "default_model": "gemini-x"}
+    assert config.CONFIG_FILE == str(config_home / ".config" / "smart-shell" / "config.json")
+
+def test_load_returns_a_copy(config_home):
+    config.save_config({"api_key": "k"})
+    loaded = config.load_config()
+    loaded["api_key"] = "changed"
+    assert config.load_config() == {"api_key": "k"}
+
+def test_unchanged_file_is_not_parsed_again(config_home, monkeypatch):
+    config.save_config({"api_key": "k"})
+    config.clear_config_cache()
+    config.load_config()
+    calls = []
+    real_loads = config.jsonlib.loads
+    monkeypatch.setattr(config.jsonlib, "loads", lambda data: calls.append(data) or real_loads(data))
+    assert config.load_config() == {"api_key": "k"}
+    assert calls == []
+
+def test_save_primes_the_cache(config_home, monkeypatch):
+    config.save_config({"api_key": "k"})
+    calls = []
+    real_loads = config.jsonlib.loads
+    monkeypatch.setattr(config.jsonlib, "loads", lambda data: calls.append(data) or real_loads(data))
+    assert config.load_config() == {"api_key": "k"}
+    assert calls == []
+
+def test_external_change_is_picked_up(config_home):
+    config.save_config({"api_key": "k"})
+    config.load_config()
+    with open(config.CONFIG_FILE, "w") as f:
+        f.write('{"api_key": "other-key"}')
+    assert config.load_config() == {"api_key": "other-key"}
+
+def test_update_config_merges(config_home):
+    config.save_config({"api_key": "k"})
+    config.update_config(default_model="gemini-y")
+    assert config.load_config() == {"api_key": "k", "default_model": "gemini-y"}
+    assert config.get_current_model() == "gemini-y"
+
+def test_new_config_is_private(config_home):
+    config.save_config({"api_key": "k"})
+    assert _mode(config.CONFIG_FILE) == 0o600
+
+def test_save_keeps_existing_permissions(config_home):
+    config.save_config({"api_key": "k"})
+    os.chmod(config.CONFIG_FILE, 0o640)
+    config.save_config({"api_key": "k2"})
+    assert _mode(config.CONFIG_FILE) == 0o640
+
+def test_save_leaves_no_temp_files(config_home):
+    config.save_config({"api_key": "k"})
+    config.save_config({"api_key": "k2"})
+    assert os.listdir(config._config_dir()) == ["config.json"]
+
+def test_failed_save_keeps_old_config(config_home, monkeypatch):
+    config.save_config({"api_key": "k"})
+
+    def fail(src, dst):
+        raise OSError("disk full")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(config.os, "replace", fail)
+        config.save_config({"api_key": "lost"})
+    assert config.load_config() == {"api_key": "k"}
+    assert os.listdir(config._config_dir()) == ["config.json"]
+
+def test_write_atomic_replaces_contents(tmp_path):
+    path = tmp_path / "data.json"
+    config.write_atomic(str(path), b"one")
+    config.write_atomic(str(path), b"two")
+    assert path.read_bytes() == b"two"
+    assert os.listdir(tmp_path) == ["data.json"]
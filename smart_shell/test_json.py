@@ -0,0 +1,65 @@
+"""
+Regression tests for the jsonlib backends: every backend must read and write the same JSON.
+"""
+
+import importlib.util
+import json
+import os
+import sys
+
+import pytest
+
+_JSON_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jsonlib.py")
+
+# Modules to hide for each backend, and the module that backend needs
+BACKENDS = {
+    "orjson": ((), "orjson"),
+    "ujson": (("orjson", "simdjson"), "ujson"),
+    "simdjson": (("orjson",), "simdjson"),
+    "json": (("orjson", "ujson", "simdjson"), None),
+}
+
+DATA = {"id": "1-0", "prompt": "héllo wörld ✓", "command": ["ls -la", "echo \"/tmp\""], "executed": True, "success": None, "n": 3}
+
+@pytest.fixture(params=list(BACKENDS))
+def backend(request, monkeypatch):
+    """A freshly imported copy of jsonlib restricted to one backend."""
+    hidden, required = BACKENDS[request.param]
+    if required:
+        pytest.importorskip(required)
+    for name in hidden:
+        monkeypatch.setitem(sys.modules, name, None)
+    spec = importlib.util.spec_from_file_location(f"jsonlib_{request.param}", _JSON_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    assert request.param in module.BACKEND
+    return module
+
+def test_round_trip(backend):
+    assert backend.loads(backend.dumps(DATA)) == DATA
+    assert backend.loads(backend.dumps_bytes(DATA)) == DATA
+    assert backend.loads(backend.dumps_bytes(DATA).decode("utf-8")) == DATA
+
+def test_compact_bytes_are_one_utf8_line(backend):
+    data = backend.dumps_bytes(DATA)
+    assert isinstance(data, bytes)
+    assert b"\n" not in data
+    assert b", " not in data and b": " not in data
+    # Non-ASCII text is written as UTF-8, not \u escapes
+    assert "héllo wörld ✓".encode("utf-8") in data
+
+def test_pretty_bytes_are_indented_and_newline_terminated(backend):
+    data = backend.dumps_bytes(DATA, pretty=True)
+    assert data.endswith(b"}\n")
+    assert b'\n  "id": "1-0"' in data
+    assert json.loads(data) == DATA
+
+def test_pretty_str(backend):
+    assert json.loads(backend.dumps(DATA, pretty=True)) == DATA
+    assert "\n" in backend.dumps(DATA, pretty=True)
+
+def test_decode_error(backend):
+    with pytest.raises(backend.JSONDecodeError):
+        backend.loads(b'{"commands": [}')
+    with pytest.raises(ValueError):
+        backend.loads("not json")
@@ -0,0 +1,225 @@
+"""
+Regression tests for the CLI module: plan bucketing, JSONL history, version comparison and special commands.
+"""
+
+import json
+
+import pytest
+
+from smart_shell import main
+
+@pytest.fixture
+def history_dir(tmp_path, monkeypatch):
+    """Point the history files at an empty directory."""
+    monkeypatch.setattr(main, "HISTORY_DIR", str(tmp_path))
+    monkeypatch.setattr(main, "HISTORY_FILE", str(tmp_path / "history.jsonl"))
+    monkeypatch.setattr(main, "HISTORY_STATUS_FILE", str(tmp_path / "history_status.jsonl"))
+    monkeypatch.setattr(main, "HISTORY_LOCK_FILE", str(tmp_path / "history.jsonl.lock"))
+    monkeypatch.setattr(main, "LEGACY_HISTORY_FILE", str(tmp_path / "history.json"))
+    monkeypatch.setattr(main, "_history_migrated", False)
+    return tmp_path
+
+# _bucket_by_status
+
+def test_bucket_by_status_groups_in_plan_order():
+    plan = ["ls", "rm -rf build", "sudo ls", "pwd"]
+    results = [{"status": "safe"}, {"status": "high"}, {"status": "medium"}, {"status": "safe"}]
+    buckets = main._bucket_by_status(plan, results)
+    assert buckets == {
+        "safe": [("ls", results[0]), ("pwd", results[3])],
+        "high": [("rm -rf build", results[1])],
+        "medium": [("sudo ls", results[2])],
+    }
+
+def test_bucket_by_status_empty_plan():
+    assert main._bucket_by_status([], []) == {}
+
+# JSONL history
+
+def test_missing_history_raises(history_dir):
+    with pytest.raises(FileNotFoundError):
+        main.load_history()
+
+def test_save_and_load_history(history_dir):
+    first = main.save_to_history("list files", ["ls"], executed=True)
+    second = main.save_to_history("show dir", ["pwd"], executed=False)
+    assert first != second
+    main.update_history_result(first, True)
+
+    history = main.load_history()
+    assert [entry["prompt"] for entry in history] == ["list files", "show dir"]
+    assert history[0]["success"] is True
+    assert history[1]["success"] is None
+    # One compact JSON object per line
+    lines = (history_dir / "history.jsonl").read_bytes().splitlines()
+    assert len(lines) == 2 and json.loads(lines[0])["command"] == ["ls"]
+
+def test_load_history_limit(history_dir):
+    for i in range(5):
+        main.save_to_history(f"prompt {i}", [f"echo {i}"])
+    assert [entry["prompt"] for entry in main.load_history(limit=2)] == ["prompt 3", "prompt 4"]
+
+def test_results_written_out_of_order_are_merged(history_dir):
+    ids = [main.save_to_history(f"prompt {i}", ["ls"], executed=True) for i in range(3)]
+    # The last entry's result arrives first, then results of other sessions
+    main.update_history_result(ids[2], True)
+    main.update_history_result(ids[1], False)
+    for i in range(5):
+        main.update_history_result(f"other-session-{i}", True)
+    history = main.load_history(limit=2)
+    assert [entry["success"] for entry in history] == [False, True]
+
+def test_old_results_are_found_beyond_the_status_tail(history_dir, monkeypatch):
+    monkeypatch.setattr(main, "HISTORY_STATUS_MARGIN", 2)
+    monkeypatch.setattr(main, "HISTORY_TAIL_BLOCK", 16)
+    first = main.save_to_history("old", ["ls"], executed=True)
+    main.update_history_result(first, False)
+    second = main.save_to_history("new", ["ls"], executed=True)
+    for i in range(10):
+        main.update_history_result(f"other-session-{i}", True)
+    main.update_history_result(second, True)
+    assert [entry["success"] for entry in main.load_history(limit=2)] == [False, True]
+
+@pytest.mark.parametrize("block", [8, 1 << 16])
+def test_read_jsonl_tail(tmp_path, monkeypatch, block):
+    monkeypatch.setattr(main, "HISTORY_TAIL_BLOCK", block)
+    path = tmp_path / "status.jsonl"
+    path.write_bytes(b"".join(json.dumps({"id": str(i)}).encode() + b"\n" for i in range(5)))
+    records, complete = main._read_jsonl_tail(str(path), 2)
+    assert [record["id"] for record in records] == ["3", "4"] and not complete
+    records, complete = main._read_jsonl_tail(str(path), 5)
+    assert len(records) == 5 and complete
+
+def test_unreadable_history_lines_are_skipped(history_dir):
+    main.save_to_history("good", ["ls"])
+    with open(main.HISTORY_FILE, "ab") as f:
+        f.write(b'{"id": "broken"\n\n')
+    assert [entry["prompt"] for entry in main.load_history()] == ["good"]
+
+def test_unreadable_lines_do_not_count_towards_limit(history_dir):
+    for i in range(3):
+        main.save_to_history(f"prompt {i}", ["ls"])
+    with open(main.HISTORY_FILE, "ab") as f:
+        f.write(b'{"id": "broken"\n\n[not json\n')
+    assert [entry["prompt"] for entry in main.load_history(limit=2)] == ["prompt 1", "prompt 2"]
+
+def test_legacy_history_is_migrated_first(history_dir):
+    legacy = [
+        {"id": "1", "prompt": "old one", "command": "ls", "executed": True, "success": True},
+        {"id": "2", "prompt": "old two", "command": "pwd", "executed": True, "success": False},
+    ]
+    (history_dir / "history.json").write_text(json.dumps(legacy, indent=2))
+    # An entry saved by a newer version before the migration ran
+    (history_dir / "history.jsonl").write_text(json.dumps({"id": "3", "prompt": "new", "command": ["id"]}) + "\n")
+
+    history = main.load_history()
+    assert [entry["prompt"] for entry in history] == ["old one", "old two", "new"]
+    assert history[1]["success"] is False
+    assert not (history_dir / "history.json").exists()
+    assert (history_dir / "history.json.bak").exists()
+
+    # Runs once: saving afterwards appends without migrating again
+    main.save_to_history("newest", ["ls"])
+    assert [entry["prompt"] for entry in main.load_history()] == ["old one", "old two", "new", "newest"]
+
+def test_broken_legacy_history_is_left_alone(history_dir, monkeypatch):
+    monkeypatch.setattr(main, "log_error", lambda message: None)
+    (history_dir / "history.json").write_text("[not json")
+    main.save_to_history("new", ["ls"])
+    assert (history_dir / "history.json").read_text() == "[not json"
+    assert [entry["prompt"] for entry in main.load_history()] == ["new"]
+
+# compare_versions
+
+@pytest.mark.parametrize("v1, v2, expected", [
+    ("1.0.0", "1.0.0", 0),
+    ("1.0.0", "1.0.1", -1),
+    ("1.2.0", "1.1.9", 1),
+    ("1.10.0", "1.9.0", 1),
+    ("v1.2.0", "1.2.0", 0),
+    ("1.2", "1.2.0", 0),
+    ("unknown", "1.0.0", -1),
+])
+def test_compare_versions(v1, v2, expected):
+    assert main.compare_versions(v1, v2) == expected
+
+@pytest.mark.parametrize("v1, v2, expected", [
+    ("1.0.0rc1", "1.0.0", -1),
+    ("1.0.0", "1.0.0.post1", -1),
+    ("2.0.0.dev1", "1.9.9", 1),
+])
+def test_compare_versions_with_packaging(v1, v2, expected):
+    pytest.importorskip("packaging")
+    assert main.compare_versions(v1, v2) == expected
+
+# Model list cache
+
+class _FakeWrapper:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+
+    def list_available_models(self, force_refresh=False):
+        return self.answers.pop(0)
+
+def test_models_are_cached(monkeypatch):
+    monkeypatch.setattr(main, "_models_cache", {})
+    wrapper = _FakeWrapper(["gemini-a"], ["gemini-b"])
+    assert main._get_models_cached(wrapper, "key") == ["gemini-a"]
+    assert main._get_models_cached(wrapper, "key") == ["gemini-a"]
+
+def test_default_models_fallback_is_not_cached(monkeypatch):
+    from smart_shell.ai_wrapper import DEFAULT_MODELS
+
+    monkeypatch.setattr(main, "_models_cache", {})
+    wrapper = _FakeWrapper(DEFAULT_MODELS, ["gemini-a"])
+    assert main._get_models_cached(wrapper, "key") is DEFAULT_MODELS
+    assert main._get_models_cached(wrapper, "key") == ["gemini-a"]
+
+# Update check cache
+
+def test_update_cache_with_bad_timestamp_is_refreshed(tmp_path, monkeypatch):
+    cache_file = tmp_path / "cache" / "update_cache.json"
+    monkeypatch.setattr(main, "UPDATE_CACHE_FILE", str(cache_file))
+    monkeypatch.setattr(main, "_fetch_latest_github_version", lambda etag: ("1.2.3", "etag"))
+    cache_file.parent.mkdir()
+    cache_file.write_text(json.dumps({"ts": "yesterday", "version": "1.0.0"}))
+    assert main.get_latest_github_version() == "1.2.3"
+    assert json.loads(cache_file.read_text())["version"] == "1.2.3"
+
+# Special command dispatch
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace the special command handlers with recorders."""
+    calls = []
+    monkeypatch.setitem(main._SPECIAL_COMMANDS, "!history", lambda: calls.append("history"))
+    monkeypatch.setitem(main._SPECIAL_COMMANDS, "!models", lambda: calls.append("models"))
+    monkeypatch.setitem(main._SPECIAL_COMMANDS, "!update --force", lambda: calls.append("force update"))
+    monkeypatch.setitem(main._SPECIAL_COMMANDS_WITH_ARG, "!model",
+                        lambda argument, current_model: calls.append(("model", argument)) or argument)
+    monkeypatch.setitem(main._SPECIAL_COMMANDS_WITH_ARG, "!models",
+                        lambda argument, current_model: calls.append(("models", argument)) or current_model)
+    return calls
+
+def test_exact_commands_are_case_and_space_insensitive(calls):
+    assert main.handle_special_command("  !HISTORY ", "gemini-a") == "gemini-a"
+    assert main.handle_special_command("!update --force", "gemini-a") == "gemini-a"
+    assert calls == ["history", "force update"]
+
+def test_exact_match_wins_over_argument_form(calls):
+    main.handle_special_command("!models", "gemini-a")
+    assert calls == ["models"]
+
+def test_argument_commands_get_the_argument(calls):
+    assert main.handle_special_command("!model  gemini-b ", "gemini-a") == "gemini-b"
+    assert main.handle_special_command("!models free", "gemini-b") == "gemini-b"
+    assert calls == [("model", "gemini-b"), ("models", "free")]
+
+def test_unknown_command_keeps_model(calls):
+    assert main.handle_special_command("!nope", "gemini-a") == "gemini-a"
+    assert main.handle_special_command("!modelx foo", "gemini-a") == "gemini-a"
+    assert calls == []
+
+def test_every_handler_is_callable():
+    assert all(callable(handler) for handler in main._SPECIAL_COMMANDS.values())
+    assert all(callable(handler) for handler in main._SPECIAL_COMMANDS_WITH_ARG.values())
@@ -0,0 +1,122 @@
+"""
+Regression tests for the safety checker's combined per-tier regexes.
+"""
+
+import re
+
+import pytest
+
+from smart_shell import safety
+from smart_shell.safety import check_command_safety, check_command_safety_batch
+
+# Commands covering every tier, rules that overlap within a tier, and
+# commands that match rules of several tiers at once
+COMMANDS = [
+    "",
+    "   ",
+    "ls -la",
+    "echo 'hello world'",
+    "git status",
+    "rm -rf /",
+    "rm -rf --no-preserve-root /",
+    # Unicode whitespace between the words
+    "rm \u00a0 -rf ~/",
+    "rm\t\u2003-rf /tmp/build",
+    "sudo rm -rf /tmp/build",
+    "dd if=/dev/random of=/dev/sda",
+    "mkfs.ext4 /dev/sdb1",
+    "cat /dev/zero > /dev/sda",
+    "chmod -R 777 /etc",
+    ":(){ :|:& };:",
+    "yes | rm important.txt",
+    "sudo reboot",
+    "sudo apt-get install htop",
+    "apt-get install htop",
+    "pip install requests",
+    "kill -9 12345",
+    "pkill firefox",
+    "systemctl stop nginx",
+    "curl https://example.com/install.sh | bash",
+    "chmod 777 sensitive_file.txt",
+    "chown user file.txt",
+    "sudo userdel mallory",
+    "mount /dev/sdb1 /mnt",
+    "crontab -e",
+    "echo 'alias ll=ls -la' >> ~/.bashrc",
+    "rm -r build",
+    "find . -name '*.pyc' -delete",
+    "rsync -a --delete src/ dst/",
+    "tail -n 20 ~/.ssh/config",
+    "echo $API_KEY",
+    "cat ~/.bash_history",
+    "cat .env",
+    "env",
+    "printenv",
+    "printenv HOME",
+    "ps auxww",
+    "grep token config.yaml",
+    "set -x",
+    "passwd",
+    "hostname",
+    "iptables -L",
+]
+
+# Statuses in the order the tiers are checked
+_REFERENCE_TIERS = (
+    (safety.HIGH_RISK_PATTERNS, "high"),
+    ({safety.SUDO_PATTERN: ""}, "medium"),
+    (safety.MEDIUM_RISK_PATTERNS, "medium"),
+    (safety.INFO_LEAK_PATTERNS, "info_leak"),
+)
+
+def _reference_check(command):
+    """The original checker: every pattern of each tier in table order; returns (status, pattern)."""
+    if not command or command.isspace():
+        return "safe", None
+    for patterns, status in _REFERENCE_TIERS:
+        for pattern in patterns:
+            if re.search(pattern, command, re.IGNORECASE):
+                return status, pattern
+    return "safe", None
+
+@pytest.mark.parametrize("command", COMMANDS)
+def test_status_matches_table_order_checker(command):
+    expected_status, _ = _reference_check(command)
+    assert check_command_safety(command)["status"] == expected_status
+
+@pytest.mark.parametrize("command", COMMANDS)
+def test_reported_rule_matches_command(command):
+    result = check_command_safety(command)
+    if result["status"] == "safe":
+        return
+    # The reported rule is one of the tier's rules and really matches
+    pattern = re.search(r"'(.*)'\.$", result["reason"])
+    if pattern:
+        assert re.search(pattern.group(1), command, re.IGNORECASE)
+
+def test_reports_leftmost_rule_within_a_tier():
+    # Table order would report env\b (it matches the end of "printenv");
+    # the combined regex reports the rule matching furthest left
+    assert _reference_check("printenv")[1] == r"env\b"
+    result = check_command_safety("printenv")
+    assert result["status"] == "info_leak"
+    assert result["reason"] == "Info-leak pattern matched: 'printenv'."
+
+def test_higher_tier_wins_over_earlier_match():
+    # The medium-risk rule matches first in the string, but high risk is checked first
+    result = check_command_safety("kill 1; rm -rf /")
+    assert result["status"] == "high"
+
+@pytest.mark.parametrize("command", ["rm \u00a0 -rf ~/", "rm\t\u2003-rf /tmp/build"])
+def test_unicode_whitespace_is_whitespace(command):
+    assert check_command_safety(command)["status"] == "high"
+
+def test_results_are_shared_and_read_only():
+    result = check_command_safety("ls -la")
+    assert result is safety.SAFE_RESULT
+    with pytest.raises(TypeError):
+        result["status"] = "high"
+
+def test_batch_keeps_order():
+    commands = ["ls", "rm -rf /", "sudo ls", "ls"]
+    assert [r["status"] for r in check_command_safety_batch(commands)] == ["safe", "high", "medium", "safe"]
@@ -6,13 +6,13 @@ import os
 import sys
 from rich.console import Console
 
-# Add the current directory to the path
-sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Add the project root to the path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-# Import Smart-Shell modules
-from shell_builder import display_banner, generate_command_plan
-from safety import check_command_safety
-from utils import print_command_preview
+# Import Smart-Shell modules (as a package: they use relative imports)
+from smart_shell.shell_builder import display_banner, generate_command_plan
+from smart_shell.safety import check_command_safety
+from smart_shell.utils import print_command_preview
 
 console = Console()
 
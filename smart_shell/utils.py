@@ -12,9 +12,6 @@ import re
 from typing import Dict, Any, Optional, Tuple
 from rich.console import Console
 from rich.panel import Panel
-from rich.syntax import Syntax
-from rich.table import Table
-from rich.markdown import Markdown
 from rich.prompt import Prompt
 from datetime import datetime
 
@@ -245,6 +242,8 @@ def print_plan_preview(command_plan: list[str], safety_results: list[dict[str, A
         command_plan (list[str]): The list of commands to be executed.
         safety_results (list[dict[str, Any]]): The safety check results for each command.
     """
+    from rich.table import Table
+
     table = Table(title="[bold]Execution Plan[/bold]", show_header=True, header_style="bold magenta")
     table.add_column("Step", style="dim", width=5)
     table.add_column("Command", style="cyan")
@@ -291,6 +290,8 @@ def print_command_preview(command: str, safety_result: Dict[str, Any]) -> None:
 
 def format_help_text(text: str) -> None:
     """DEPRECATED: No longer needed with rich text."""
+    from rich.markdown import Markdown
+
     md = Markdown(text)
     console.print(md)
     